@@ -0,0 +1,24 @@
+"""Общая настройка Django для скриптов бенчмарков."""
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'blogicum'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+
+
+def setup_django(db_path, migrate=True, **overrides):
+    """Настраивает Django на отдельный файл SQLite и применяет миграции."""
+    from django.conf import settings
+
+    settings.DATABASES['default']['NAME'] = str(db_path)
+    settings.DEBUG = False
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+
+    import django
+    from django.core.management import call_command
+
+    django.setup()
+    if migrate:
+        call_command('migrate', verbosity=0)
@@ -0,0 +1,494 @@
+"""Нагрузочный тест блога по настоящему URLconf.
+
+Запуск из корня репозитория:
+
+    python benchmarks/load_test.py --app wsgi --concurrency 4 --seconds 20
+    python benchmarks/load_test.py --app http --json runs/head.json
+    python benchmarks/load_test.py --compare runs/main.json runs/HEAD.json
+
+--app wsgi и asgi вызывают приложения из blogicum/wsgi.py и asgi.py
+прямо в этом процессе, http поднимает WSGI-приложение под локальным
+сервером wsgiref и ходит к нему по сокету. Внешние сервисы не нужны:
+данные создаёт seed_blog во временной базе (или берётся готовая база
+из --db). Смесь запросов — MIX: лента, категории, посты, профили,
+комментарии от вошедших пользователей и страницы входа и регистрации.
+Число SQL-запросов на ответ берётся из заголовка Server-Timing
+(pages/instrumentation.py), поэтому считается одинаково во всех режимах.
+"""
+import argparse
+import asyncio
+import io
+import json
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict, namedtuple
+from http.client import HTTPConnection
+from pathlib import Path
+from socketserver import ThreadingMixIn
+from urllib.parse import urlencode
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+from wsgiref.util import setup_testing_defaults
+
+from common import setup_django
+
+# Имя URL -> вес в смеси запросов.
+MIX = {
+    'blog:index': 30,
+    'blog:category_posts': 15,
+    'blog:post_detail': 25,
+    'blog:profile': 10,
+    'blog:add_comment': 5,
+    'login': 10,
+    'registration': 5,
+}
+PROFILES = ('default', 'production')
+# Секрет CSRF из 32 символов годится и для cookie, и для X-CSRFToken.
+CSRF_SECRET = 'loadtest' * 4
+SQL_COUNT = re.compile(r'desc="(\d+) SQL"')
+
+Request = namedtuple('Request', 'name method path body cookies')
+Sample = namedtuple('Sample', 'name started latency status queries')
+
+
+def profile_settings(profile, db_path):
+    if profile == 'default':
+        return {}
+    from blogicum import settings_production
+
+    database = dict(settings_production.DATABASES['default'])
+    database['NAME'] = str(db_path)
+    return {'DATABASES': {'default': database}}
+
+
+def prepare(args, tmp):
+    db_path = Path(args.db) if args.db else Path(tmp) / 'load.sqlite3'
+    setup_django(
+        db_path, ALLOWED_HOSTS=['*'], METRICS_DIR=Path(tmp) / 'metrics',
+        **profile_settings(args.profile, db_path),
+    )
+    from django.core.management import call_command
+
+    if not args.db:
+        call_command(
+            'seed_blog', users=max(args.users, args.concurrency),
+            posts=args.posts, comments=args.comments, seed=args.seed,
+        )
+
+
+class Traffic:
+    """Выбирает следующий запрос по весам MIX среди реальных объектов."""
+
+    def __init__(self, concurrency):
+        from django.conf import settings
+        from django.contrib.auth import get_user_model
+        from django.test import Client
+
+        from blog.models import Category, Post
+        from blog.views import filter_posts
+
+        # Свежие публикации читают чаще, поэтому выборка — самые новые.
+        self.post_ids = list(
+            filter_posts(Post.objects).values_list('pk', flat=True)[:5000]
+        )
+        self.categories = list(Category.objects.filter(
+            is_published=True, posts__isnull=False,
+        ).values_list('slug', flat=True).distinct())
+        self.authors = list(Post.objects.values_list(
+            'author__username', flat=True
+        ).distinct()[:1000])
+        if not (self.post_ids and self.categories):
+            raise SystemExit('В базе нет видимых публикаций.')
+        self.sessions = []
+        for user in get_user_model().objects.order_by('pk')[:concurrency]:
+            client = Client()
+            client.force_login(user)
+            self.sessions.append(
+                client.cookies[settings.SESSION_COOKIE_NAME].value
+            )
+        self.session_cookie = settings.SESSION_COOKIE_NAME
+        self.csrf_cookie = settings.CSRF_COOKIE_NAME
+        self.names = list(MIX)
+        self.weights = list(MIX.values())
+
+    def next(self, rng, worker):
+        from django.urls import reverse
+
+        name = rng.choices(self.names, weights=self.weights)[0]
+        method, body, cookies = 'GET', b'', {}
+        if name == 'blog:category_posts':
+            path = reverse(name, args=[rng.choice(self.categories)])
+        elif name in ('blog:post_detail', 'blog:add_comment'):
+            path = reverse(name, args=[rng.choice(self.post_ids)])
+        elif name == 'blog:profile':
+            path = reverse(name, args=[rng.choice(self.authors)])
+        else:
+            path = reverse(name)
+        if name == 'blog:add_comment':
+            method = 'POST'
+            body = urlencode({'text': 'Комментарий под нагрузкой'}).encode()
+            cookies = {
+                self.session_cookie:
+                    self.sessions[worker % len(self.sessions)],
+                self.csrf_cookie: CSRF_SECRET,
+            }
+        return Request(name, method, path, body, cookies)
+
+
+def _cookie_header(cookies):
+    return '; '.join(f'{key}={value}' for key, value in cookies.items())
+
+
+def _queries(headers):
+    match = SQL_COUNT.search(headers.get('server-timing', ''))
+    return int(match[1]) if match else None
+
+
+def call_wsgi(app, request):
+    environ = {
+        'REQUEST_METHOD': request.method,
+        'PATH_INFO': request.path,
+        'SERVER_NAME': '127.0.0.1',
+        'wsgi.input': io.BytesIO(request.body),
+        'CONTENT_LENGTH': str(len(request.body)),
+    }
+    if request.body:
+        environ['CONTENT_TYPE'] = 'application/x-www-form-urlencoded'
+        environ['HTTP_X_CSRFTOKEN'] = CSRF_SECRET
+    if request.cookies:
+        environ['HTTP_COOKIE'] = _cookie_header(request.cookies)
+    setup_testing_defaults(environ)
+    started = []
+
+    def start_response(status, headers, exc_info=None):
+        started.append((int(status[:3]), headers))
+
+    body = app(environ, start_response)
+    try:
+        for _ in body:
+            pass
+    finally:
+        if hasattr(body, 'close'):
+            body.close()
+    status, headers = started[0]
+    return status, {key.lower(): value for key, value in headers}
+
+
+async def call_asgi(app, request):
+    headers = [(b'host', b'127.0.0.1')]
+    if request.body:
+        headers += [
+            (b'content-type', b'application/x-www-form-urlencoded'),
+            (b'content-length', str(len(request.body)).encode()),
+            (b'x-csrftoken', CSRF_SECRET.encode()),
+        ]
+    if request.cookies:
+        headers.append((b'cookie', _cookie_header(request.cookies).encode()))
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': request.method, 'scheme': 'http',
+        'path': request.path, 'raw_path': request.path.encode(),
+        'query_string': b'', 'root_path': '', 'headers': headers,
+        'client': ('127.0.0.1', 0), 'server': ('127.0.0.1', 80),
+    }
+    done = asyncio.Event()
+    pending = [{'type': 'http.request', 'body': request.body}]
+    response = {}
+
+    async def receive():
+        if pending:
+            return pending.pop()
+        await done.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            response['status'] = message['status']
+            response['headers'] = {
+                key.decode().lower(): value.decode()
+                for key, value in message['headers']
+            }
+        elif not message.get('more_body'):
+            done.set()
+
+    await app(scope, receive, send)
+    done.set()
+    return response['status'], response['headers']
+
+
+def call_http(address, request):
+    headers = {}
+    if request.body:
+        headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        headers['X-CSRFToken'] = CSRF_SECRET
+    if request.cookies:
+        headers['Cookie'] = _cookie_header(request.cookies)
+    connection = HTTPConnection(*address)
+    try:
+        connection.request(
+            request.method, request.path, body=request.body or None,
+            headers=headers,
+        )
+        response = connection.getresponse()
+        response.read()
+        return response.status, {
+            key.lower(): value for key, value in response.getheaders()
+        }
+    finally:
+        connection.close()
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class QuietHandler(WSGIRequestHandler):
+
+    def log_message(self, *args):
+        pass
+
+
+def run_threads(call, traffic, args):
+    from django.db import connections
+
+    samples = []
+    deadline = time.perf_counter() + args.warmup + args.seconds
+
+    def worker(number):
+        rng = random.Random(args.seed * 1000 + number)
+        collected = []
+        while time.perf_counter() < deadline:
+            request = traffic.next(rng, number)
+            started = time.perf_counter()
+            try:
+                status, headers = call(request)
+            except Exception:
+                status, headers = 599, {}
+            collected.append(Sample(
+                request.name, started, time.perf_counter() - started,
+                status, _queries(headers),
+            ))
+        connections.close_all()
+        samples.extend(collected)
+
+    threads = [
+        threading.Thread(target=worker, args=(number,))
+        for number in range(args.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples
+
+
+def run_asgi(app, traffic, args):
+    async def worker(number, deadline):
+        rng = random.Random(args.seed * 1000 + number)
+        collected = []
+        while time.perf_counter() < deadline:
+            request = traffic.next(rng, number)
+            started = time.perf_counter()
+            try:
+                status, headers = await call_asgi(app, request)
+            except Exception:
+                status, headers = 599, {}
+            collected.append(Sample(
+                request.name, started, time.perf_counter() - started,
+                status, _queries(headers),
+            ))
+        return collected
+
+    async def main():
+        deadline = time.perf_counter() + args.warmup + args.seconds
+        results = await asyncio.gather(*(
+            worker(number, deadline) for number in range(args.concurrency)
+        ))
+        return [sample for collected in results for sample in collected]
+
+    return asyncio.run(main())
+
+
+def run(args, traffic):
+    if args.app == 'asgi':
+        from blogicum.asgi import application
+
+        return run_asgi(application, traffic, args)
+    from blogicum.wsgi import application
+
+    if args.app == 'wsgi':
+        return run_threads(
+            lambda request: call_wsgi(application, request), traffic, args
+        )
+    server = make_server(
+        '127.0.0.1', 0, application,
+        server_class=ThreadingWSGIServer, handler_class=QuietHandler,
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        return run_threads(
+            lambda request: call_http(server.server_address, request),
+            traffic, args,
+        )
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def summarize(samples, seconds):
+    latencies = sorted(sample.latency for sample in samples)
+    queries = [
+        sample.queries for sample in samples if sample.queries is not None
+    ]
+    if len(latencies) > 1:
+        cuts = statistics.quantiles(latencies, n=100, method='inclusive')
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = latencies[0] if latencies else 0.0
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for sample in samples if sample.status >= 400),
+        'rps': len(samples) / seconds,
+        'p50_ms': p50 * 1000,
+        'p95_ms': p95 * 1000,
+        'p99_ms': p99 * 1000,
+        'queries_per_request': (
+            sum(queries) / len(queries) if queries else None
+        ),
+    }
+
+
+def report(samples, args, started_at):
+    measured_from = started_at + args.warmup
+    samples = [
+        sample for sample in samples if sample.started >= measured_from
+    ]
+    by_name = defaultdict(list)
+    for sample in samples:
+        by_name[sample.name].append(sample)
+    return {
+        'meta': {
+            'app': args.app,
+            'profile': args.profile,
+            'concurrency': args.concurrency,
+            'seconds': args.seconds,
+            'seed': args.seed,
+            'posts': None if args.db else args.posts,
+            'comments': None if args.db else args.comments,
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'django': django_version(),
+        },
+        'overall': summarize(samples, args.seconds),
+        'endpoints': {
+            name: summarize(by_name[name], args.seconds)
+            for name in MIX if by_name[name]
+        },
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def django_version():
+    import django
+
+    return django.get_version()
+
+
+def _queries_cell(value):
+    return f'{value:>10.1f}' if value is not None else f'{"—":>10}'
+
+
+def print_report(result):
+    print(f'{"адрес":<22}{"запросов":>9}{"ошибки":>8}{"запр/с":>9}'
+          f'{"p50, мс":>9}{"p95, мс":>9}{"p99, мс":>9}{"SQL/ответ":>10}')
+    rows = [*result['endpoints'].items(), ('всего', result['overall'])]
+    for name, row in rows:
+        print(f'{name:<22}{row["requests"]:>9}{row["errors"]:>8}'
+              f'{row["rps"]:>9.1f}{row["p50_ms"]:>9.1f}'
+              f'{row["p95_ms"]:>9.1f}{row["p99_ms"]:>9.1f}'
+              f'{_queries_cell(row["queries_per_request"])}')
+
+
+def compare(old_path, new_path):
+    old = json.loads(Path(old_path).read_text())
+    new = json.loads(Path(new_path).read_text())
+    print(f'{old["meta"]["commit"]} -> {new["meta"]["commit"]}')
+    print(f'{"адрес":<22}{"запр/с":>16}{"p95, мс":>18}{"SQL/ответ":>14}')
+    names = [*new['endpoints'], 'всего']
+    for name in names:
+        before = old['endpoints'].get(name) if name != 'всего' else (
+            old['overall']
+        )
+        after = new['endpoints'][name] if name != 'всего' else new['overall']
+        if before is None:
+            continue
+        rps, p95, queries = (
+            _change(before[key], after[key])
+            for key in ('rps', 'p95_ms', 'queries_per_request')
+        )
+        print(f'{name:<22}{rps:>16}{p95:>18}{queries:>14}')
+
+
+def _change(before, after):
+    if before is None or after is None:
+        return '—'
+    if not before:
+        return f'{after:.1f}'
+    return f'{after:.1f} ({(after - before) / before:+.0%})'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--app', choices=('wsgi', 'asgi', 'http'),
+                        default='wsgi')
+    parser.add_argument('--profile', choices=PROFILES, default='default')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--warmup', type=float, default=2,
+                        help='Секунды в начале, не попадающие в отчёт.')
+    parser.add_argument('--posts', type=int, default=10_000)
+    parser.add_argument('--comments', type=int, default=30_000)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--db', help='Готовая база вместо seed_blog.')
+    parser.add_argument('--json', help='Куда записать результаты.')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'),
+                        help='Сравнить два JSON-отчёта и выйти.')
+    args = parser.parse_args()
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        prepare(args, tmp)
+        traffic = Traffic(args.concurrency)
+        started_at = time.perf_counter()
+        samples = run(args, traffic)
+        result = report(samples, args, started_at)
+    print_report(result)
+    if args.json:
+        Path(args.json).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.json).write_text(
+            json.dumps(result, ensure_ascii=False, indent=2)
+        )
+        print(f'Результаты записаны в {args.json}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""Время воркера на отдачу фото в разных режимах MEDIA_SERVE_MODE.
+
+Запуск из корня репозитория:
+
+    python benchmarks/media_serving.py
+
+Запросы проходят через WSGIHandler проекта. Прежний путь — serve()
+под runserver, чей wsgiref.util.FileWrapper читает файл кусками по 8 КБ
+в Python. Новые режимы эмулируют gunicorn: ответ-обёртку
+wsgi.file_wrapper он отдаёт через os.sendfile(). Тело пишется
+в /dev/null, так что замеряется только работа воркера.
+"""
+import argparse
+import io
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from wsgiref.util import FileWrapper, setup_testing_defaults
+
+from common import setup_django
+
+SIZES = (100 * 1024, 2 * 1024 * 1024, 20 * 1024 * 1024)
+# (MEDIA_SERVE_MODE, wsgi.file_wrapper сервера)
+MODES = (
+    ('django', FileWrapper),
+    ('file', 'sendfile'),
+    ('x-accel-redirect', 'sendfile'),
+)
+
+
+class SendfileWrapper:
+    """wsgi.file_wrapper сервера: тело уходит через sendfile()."""
+
+    def __init__(self, filelike, block_size=8192):
+        self.filelike = filelike
+
+    def close(self):
+        self.filelike.close()
+
+
+def request(handler, path, sink, file_wrapper, **headers):
+    environ = {'PATH_INFO': path, 'REQUEST_METHOD': 'GET'}
+    environ.update(headers)
+    setup_testing_defaults(environ)
+    environ['wsgi.input'] = io.BytesIO()
+    environ['wsgi.file_wrapper'] = (
+        SendfileWrapper if file_wrapper == 'sendfile' else file_wrapper
+    )
+    status = []
+    body = handler(environ, lambda code, headers: status.append(code))
+    sent = copied = 0
+    try:
+        if isinstance(body, SendfileWrapper):
+            source = body.filelike.fileno()
+            size = os.fstat(source).st_size
+            while sent < size:
+                sent += os.sendfile(sink, source, sent, size - sent)
+        else:
+            for chunk in body:
+                copied += os.write(sink, chunk)
+    finally:
+        body.close()
+    return status[0], sent + copied, copied
+
+
+def timed(handler, path, sink, file_wrapper, repeat, **headers):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        status, sent, copied = request(
+            handler, path, sink, file_wrapper, **headers
+        )
+        timings.append(time.perf_counter() - started)
+    return status, sent, copied, statistics.median(timings) * 1000
+
+
+def print_row(mode, label, status, sent, copied, ms):
+    print(f'{mode:<18}{label:>10}{status[:3]:>8}'
+          f'{sent // 1024:>10}КБ{copied // 1024:>13}КБ{ms:>10.2f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=30)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        media_root = Path(tmp) / 'media'
+        names = {}
+        for size in SIZES:
+            digest = f'{size:064x}'
+            name = f'posts_images/{digest[:2]}/{digest[2:4]}/{digest}.jpg'
+            path = media_root / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(os.urandom(size))
+            names[size] = name
+        setup_django(
+            Path(tmp) / 'bench.sqlite3',
+            MEDIA_ROOT=media_root,
+            ALLOWED_HOSTS=['*'],
+        )
+        from django.conf import settings
+        from django.core.handlers.wsgi import WSGIHandler
+
+        handler = WSGIHandler()
+        sink = os.open(os.devnull, os.O_WRONLY)
+        print(f'{"режим":<18}{"размер":>10}{"статус":>8}'
+              f'{"отдано":>12}{"через Python":>15}{"мс":>10}')
+        for mode, file_wrapper in MODES:
+            settings.MEDIA_SERVE_MODE = mode
+            for size, name in names.items():
+                path = f'{settings.MEDIA_URL}{name}'
+                row = timed(handler, path, sink, file_wrapper, args.repeat)
+                print_row(mode, f'{size // 1024}КБ', *row)
+            row = timed(
+                handler, path, sink, file_wrapper, args.repeat,
+                HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT',
+            )
+            print_row(mode, 'повтор', *row)
+        os.close(sink)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""Рендер 10/50/100 карточек публикаций с кэшем и без него.
+
+Запуск из корня репозитория:
+
+    python benchmarks/post_cards.py
+"""
+import argparse
+import statistics
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from common import setup_django
+
+SIZES = (10, 50, 100)
+
+
+def seed(n_posts):
+    from django.contrib.auth import get_user_model
+    from django.utils import timezone
+
+    from blog.models import Category, Location, Post
+
+    author = get_user_model().objects.create(username='bench')
+    category = Category.objects.create(
+        title='Категория', description='-', slug='bench'
+    )
+    location = Location.objects.create(name='Место')
+    now = timezone.now()
+    Post.objects.bulk_create(
+        Post(
+            title=f'Пост {i}',
+            text='Довольно длинный текст публикации. ' * 20,
+            pub_date=now - timedelta(hours=i + 1),
+            author=author,
+            category=category,
+            location=location,
+            comment_count=i,
+        )
+        for i in range(n_posts)
+    )
+
+
+def timed(template, context, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        template.render(context)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(
+            Path(tmp) / 'bench.sqlite3', BLOG_POST_CARD_CACHE_TIMEOUT=300
+        )
+        from django.core.cache import cache
+        from django.template import engines
+
+        from blog.cache import card_lru
+        from blog.models import Post
+        from blog.views import filter_posts
+
+        seed(max(SIZES))
+        engine = engines['django']
+        plain = engine.from_string(
+            '{% for post in posts %}'
+            '{% include "includes/post_card.html" %}{% endfor %}'
+        )
+        cached = engine.from_string(
+            '{% load blog_tags %}'
+            '{% for post in posts %}{% post_card post %}{% endfor %}'
+        )
+        print(f'{"карточек":>9} {"без кэша":>10} {"LRU":>10} '
+              f'{"общий кэш":>10}')
+        for size in SIZES:
+            context = {'posts': list(filter_posts(Post.objects)[:size])}
+            cache.clear()
+            card_lru.clear()
+            baseline = timed(plain, context, args.repeat)
+            cached.render(context)
+            warm = timed(cached, context, args.repeat)
+            shared = []
+            for _ in range(args.repeat):
+                card_lru.clear()
+                shared.append(timed(cached, context, 1))
+            print(f'{size:>9} {baseline:>8.2f}мс {warm:>8.2f}мс '
+                  f'{statistics.median(shared):>8.2f}мс')
+
+
+if __name__ == '__main__':
+    main()
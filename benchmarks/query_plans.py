@@ -0,0 +1,147 @@
+"""Планы и время запросов ленты до и после индексов blog.0010.
+
+Запуск из корня репозитория:
+
+    python benchmarks/query_plans.py --posts 200000
+
+База создаётся во временном файле SQLite, рабочая db.sqlite3 не трогается.
+"""
+import argparse
+import random
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from common import setup_django
+
+BEFORE = '0009_post_comment_count'
+AFTER = '0010_post_feed_indexes'
+
+
+def historical_apps(target):
+    """Модели в состоянии миграции target.
+
+    Текущие модели знают о полях из более поздних миграций, которых
+    в базе на BEFORE ещё нет.
+    """
+    from django.db import connection
+    from django.db.migrations.executor import MigrationExecutor
+
+    loader = MigrationExecutor(connection).loader
+    return loader.project_state(('blog', target)).apps
+
+
+def seed(apps, n_posts, n_categories, n_authors, batch_size=5000):
+    from django.conf import settings
+    from django.db import transaction
+    from django.utils import timezone
+
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    Category = apps.get_model('blog', 'Category')
+    Post = apps.get_model('blog', 'Post')
+
+    rng = random.Random(1)
+    users = User.objects.bulk_create(
+        User(username=f'bench{i}') for i in range(n_authors)
+    )
+    categories = Category.objects.bulk_create(
+        Category(
+            title=f'Категория {i}',
+            description='-',
+            slug=f'bench-{i}',
+            is_published=i % 10 != 0,
+        )
+        for i in range(n_categories)
+    )
+    now = timezone.now()
+    for start in range(0, n_posts, batch_size):
+        with transaction.atomic():
+            Post.objects.bulk_create(
+                Post(
+                    title=f'Пост {i}',
+                    text='Текст',
+                    pub_date=now - timedelta(minutes=rng.randrange(10 ** 6)),
+                    is_published=rng.random() > 0.05,
+                    author=rng.choice(users),
+                    category=rng.choice(categories),
+                )
+                for i in range(start, min(start + batch_size, n_posts))
+            )
+    return categories[1].slug, users[0].username
+
+
+def feed_queries(apps, category_slug, username):
+    from blog.views import filter_posts
+
+    Post = apps.get_model('blog', 'Post')
+    deep = 4000 * 10
+    return {
+        'index, page 1': filter_posts(Post.objects)[:10],
+        'index, page 4000': filter_posts(Post.objects)[deep:deep + 10],
+        'category, page 1': filter_posts(Post.objects).filter(
+            category__slug=category_slug
+        )[:10],
+        'profile, page 1': Post.objects.select_related(
+            'category', 'location', 'author'
+        ).filter(author__username=username).order_by('-pub_date')[:10],
+    }
+
+
+def measure(queries, repeat):
+    results = {}
+    for name, queryset in queries.items():
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            list(queryset._chain())
+            timings.append(time.perf_counter() - started)
+        results[name] = (queryset.explain(), min(timings) * 1000)
+    return results
+
+
+def migrate(target):
+    from django.core.management import call_command
+    from django.db import connection
+
+    call_command('migrate', 'blog', target, verbosity=0)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--posts', type=int, default=200_000)
+    parser.add_argument('--categories', type=int, default=50)
+    parser.add_argument('--authors', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(Path(tmp) / 'bench.sqlite3')
+        migrate(BEFORE)
+        # Одни и те же модели до и после: SQL запросов не меняется,
+        # меняются только индексы.
+        apps = historical_apps(BEFORE)
+        started = time.perf_counter()
+        category_slug, username = seed(
+            apps, args.posts, args.categories, args.authors
+        )
+        print(f'Создано {args.posts} публикаций '
+              f'за {time.perf_counter() - started:.1f} с\n')
+
+        queries = feed_queries(apps, category_slug, username)
+        before = measure(queries, args.repeat)
+        migrate(AFTER)
+        after = measure(queries, args.repeat)
+
+    for name in queries:
+        (plan_before, ms_before), (plan_after, ms_after) = (
+            before[name], after[name]
+        )
+        print(f'== {name}: {ms_before:.2f} мс -> {ms_after:.2f} мс')
+        print(f'-- до:\n{plan_before}\n-- после:\n{plan_after}\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""Смешанная нагрузка: чтение ленты и запись комментариев в SQLite.
+
+Запуск из корня репозитория:
+
+    python benchmarks/sqlite_concurrency.py --readers 4 --writers 2
+
+Каждый профиль получает свою временную базу. Читатели и писатели —
+отдельные процессы, как воркеры gunicorn; запросы идут через тестовый
+клиент Django со всеми middleware. Сравниваются настройки по умолчанию
+(журнал отката, новое соединение на запрос) и DATABASES из
+blogicum.settings_production (WAL, PRAGMA, CONN_MAX_AGE).
+"""
+import argparse
+import multiprocessing
+import random
+import statistics
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from common import setup_django
+
+PROFILES = ('default', 'production')
+
+
+def profile_settings(profile, db_path):
+    if profile == 'default':
+        return {}
+    from blogicum import settings_production
+
+    database = dict(settings_production.DATABASES['default'])
+    database['NAME'] = str(db_path)
+    return {'DATABASES': {'default': database}}
+
+
+def seed(db_path, profile, n_posts, n_writers):
+    setup_django(db_path, **profile_settings(profile, db_path))
+    from django.contrib.auth import get_user_model
+    from django.utils import timezone
+
+    from blog.models import Category, Location, Post
+
+    users = get_user_model().objects.bulk_create(
+        get_user_model()(username=f'writer{i}') for i in range(n_writers)
+    )
+    category = Category.objects.create(
+        title='Категория', description='-', slug='bench'
+    )
+    location = Location.objects.create(name='Место')
+    now = timezone.now()
+    Post.objects.bulk_create(
+        Post(
+            title=f'Пост {i}',
+            text='Текст публикации. ' * 20,
+            pub_date=now - timedelta(hours=i + 1),
+            author=users[i % n_writers],
+            category=category,
+            location=location,
+        )
+        for i in range(n_posts)
+    )
+
+
+def worker(role, number, db_path, profile, seconds, results):
+    setup_django(
+        db_path, migrate=False, ALLOWED_HOSTS=['*'],
+        **profile_settings(profile, db_path),
+    )
+    from django.contrib.auth import get_user_model
+    from django.db import OperationalError
+    from django.test import Client
+
+    from blog.models import Post
+
+    client = Client()
+    post_ids = list(Post.objects.values_list('pk', flat=True))
+    if role == 'writer':
+        client.force_login(
+            get_user_model().objects.get(username=f'writer{number}')
+        )
+    rng = random.Random(number)
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            if role == 'reader':
+                status = client.get('/').status_code
+            else:
+                status = client.post(
+                    f'/posts/{rng.choice(post_ids)}/comment/',
+                    {'text': 'Комментарий под нагрузкой'},
+                ).status_code
+        except OperationalError:
+            status = 500
+        if status < 400:
+            latencies.append(time.perf_counter() - started)
+        else:
+            errors += 1
+    results.put((role, latencies, errors))
+
+
+def run(profile, args, tmp):
+    context = multiprocessing.get_context('spawn')
+    db_path = Path(tmp) / f'{profile}.sqlite3'
+    seeder = context.Process(
+        target=seed, args=(db_path, profile, args.posts, args.writers)
+    )
+    seeder.start()
+    seeder.join()
+
+    results = context.Queue()
+    processes = [
+        context.Process(
+            target=worker,
+            args=(role, i, db_path, profile, args.seconds, results),
+        )
+        for role, count in (('reader', args.readers),
+                            ('writer', args.writers))
+        for i in range(count)
+    ]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    report = {}
+    for role in ('reader', 'writer'):
+        latencies = [
+            latency for name, values, _ in collected if name == role
+            for latency in values
+        ]
+        errors = sum(errors for name, _, errors in collected if name == role)
+        p95 = (
+            statistics.quantiles(latencies, n=20)[-1] * 1000
+            if len(latencies) > 1 else 0
+        )
+        report[role] = (len(latencies) / args.seconds, p95, errors)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--posts', type=int, default=300)
+    args = parser.parse_args()
+
+    print(f'{"профиль":<12}{"роль":<8}{"запр/с":>10}'
+          f'{"p95, мс":>10}{"ошибки":>8}')
+    with tempfile.TemporaryDirectory() as tmp:
+        for profile in PROFILES:
+            for role, (rps, p95, errors) in run(profile, args, tmp).items():
+                print(f'{profile:<12}{role:<8}{rps:>10.1f}'
+                      f'{p95:>10.1f}{errors:>8}')
+
+
+if __name__ == '__main__':
+    main()
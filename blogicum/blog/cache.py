@@ -0,0 +1,292 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse
+from django.template.loader import get_template, render_to_string
+from django.utils.safestring import mark_safe
+
+from .visibility import visibility_horizon
+
+KEY_PREFIX = 'blog:feed'
+INDEX_SCOPE = 'index'
+# Поколения области: страниц и, отдельно, числа публикаций в ней.
+PAGES = 'gen'
+COUNTS = 'countgen'
+
+# Бэкенды, записи которых видит только свой процесс.
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def feed_cache_timeout():
+    return getattr(settings, 'BLOG_FEED_CACHE_TIMEOUT', 0)
+
+
+def count_cache_timeout():
+    return getattr(settings, 'BLOG_COUNT_CACHE_TIMEOUT', 0)
+
+
+def invalidation_enabled():
+    return bool(feed_cache_timeout() or count_cache_timeout())
+
+
+def cache_is_shared():
+    """Видят ли записи кэша другие процессы: воркеры и команды."""
+    return settings.CACHES['default']['BACKEND'] not in PROCESS_LOCAL_BACKENDS
+
+
+def category_scope(slug):
+    return f'category:{slug}'
+
+
+def author_scope(author_id):
+    return f'author:{author_id}'
+
+
+def _generation_key(scope, kind=PAGES):
+    return f'{KEY_PREFIX}:{kind}:{scope}'
+
+
+def get_generation(scope, kind=PAGES):
+    # time_ns вместо счётчика: вытесненное из кэша поколение
+    # не совпадёт ни с одним из прежних.
+    return cache.get_or_set(_generation_key(scope, kind), time.time_ns, None)
+
+
+def invalidate_feed(*category_slugs, author_ids=(), counts=False):
+    """Сбрасывает ленту, страницы категорий и профили авторов.
+
+    counts=True сбрасывает и число публикаций для пагинатора — только
+    когда изменился состав выборки: видимость, категория или автор.
+    Новый комментарий меняет страницы, но не их число.
+    """
+    if not invalidation_enabled():
+        return
+    scopes = {INDEX_SCOPE}
+    scopes.update(category_scope(slug) for slug in category_slugs if slug)
+    scopes.update(author_scope(pk) for pk in author_ids if pk)
+    kinds = (PAGES, COUNTS) if counts else (PAGES,)
+    generation = time.time_ns()
+    cache.set_many({
+        _generation_key(scope, kind): generation
+        for scope in scopes for kind in kinds
+    }, None)
+
+
+def _count(name):
+    key = f'{KEY_PREFIX}:{name}'
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def feed_cache_stats():
+    names = ('hits', 'misses')
+    values = cache.get_many([f'{KEY_PREFIX}:{name}' for name in names])
+    return {name: values.get(f'{KEY_PREFIX}:{name}', 0) for name in names}
+
+
+def feed_page_key(view_name, scope, request):
+    page = request.GET.get('page', '')
+    cursor = request.GET.get('cursor', '')
+    # Горизонт видимости в ключе: с новой корзиной времени в ленту
+    # попадают отложенные публикации, для которых не было сигналов.
+    horizon = int(visibility_horizon().timestamp())
+    return (
+        f'{KEY_PREFIX}:{view_name}:{scope}:{get_generation(scope)}:'
+        f'{horizon}:{page}:{cursor}'
+    )
+
+
+def count_exact_threshold():
+    return getattr(settings, 'BLOG_COUNT_EXACT_THRESHOLD', 1000)
+
+
+def _refresh_count(base_key, key, queryset, timeout):
+    try:
+        count = queryset.count()
+        cache.set_many({key: count, f'{base_key}:last': count}, timeout)
+    finally:
+        cache.delete(f'{key}:refreshing')
+        connections.close_all()
+
+
+def cached_count(scope, queryset):
+    """Число объектов для пагинатора без COUNT(*) по всей выборке.
+
+    Небольшие выборки считаются точно запросом с LIMIT. Для больших
+    берётся значение из кэша; когда сигналы сбросили поколение чисел
+    области, отдаётся последнее известное число, а точное
+    пересчитывается в фоне.
+    """
+    timeout = count_cache_timeout()
+    if not timeout:
+        return queryset.count()
+    base_key = f'{KEY_PREFIX}:count:{scope}'
+    key = f'{base_key}:{get_generation(scope, COUNTS)}'
+    count = cache.get(key)
+    if count is not None:
+        return count
+    threshold = count_exact_threshold()
+    count = queryset.order_by()[:threshold + 1].count()
+    if count <= threshold:
+        return count
+    last = cache.get(f'{base_key}:last')
+    if last is None:
+        count = queryset.count()
+        cache.set_many({key: count, f'{base_key}:last': count}, timeout)
+        return count
+    if cache.add(f'{key}:refreshing', True, timeout):
+        threading.Thread(
+            target=_refresh_count,
+            args=(base_key, key, queryset, timeout),
+            daemon=True,
+        ).start()
+    return max(last, count)
+
+
+class FeedCacheMixin:
+    """Кэширует страницы ленты для анонимных посетителей.
+
+    В кэше лежат id публикаций страницы и готовый HTML. Ключ содержит
+    поколение области (лента или категория), которое сбрасывают
+    сигналы из blog/signals.py.
+    """
+
+    feed_cache_name = None
+
+    def get_cache_scope(self):
+        return INDEX_SCOPE
+
+    def get(self, request, *args, **kwargs):
+        timeout = feed_cache_timeout()
+        if not timeout or request.user.is_authenticated:
+            return super().get(request, *args, **kwargs)
+        key = feed_page_key(
+            self.feed_cache_name, self.get_cache_scope(), request
+        )
+        cached = cache.get(key)
+        if cached is not None:
+            _count('hits')
+            response = HttpResponse(cached['html'])
+            response['X-Feed-Cache'] = 'HIT'
+            return response
+        _count('misses')
+        response = super().get(request, *args, **kwargs)
+        response['X-Feed-Cache'] = 'MISS'
+
+        def store(response):
+            if response.status_code != 200:
+                return
+            cache.set(key, {
+                'ids': [post.pk for post in response.context_data['page_obj']],
+                'html': response.content,
+            }, timeout)
+
+        response.add_post_render_callback(store)
+        return response
+
+
+class LRUCache:
+    """Небольшой потокобезопасный LRU-кэш внутри процесса."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+CARD_TEMPLATE = 'includes/post_card.html'
+CARD_TEMPLATES = (
+    CARD_TEMPLATE, 'includes/category_link.html', 'includes/post_image.html'
+)
+
+card_lru = LRUCache(getattr(settings, 'BLOG_POST_CARD_LRU_SIZE', 512))
+_templates_digests = {}
+
+
+def card_cache_timeout():
+    return getattr(settings, 'BLOG_POST_CARD_CACHE_TIMEOUT', 0)
+
+
+def templates_digest(names):
+    # Исходники шаблонов в ключе: после выкладки новых шаблонов
+    # старые фрагменты и ETag не переиспользуются.
+    if names not in _templates_digests:
+        digest = hashlib.md5()
+        for name in names:
+            digest.update(get_template(name).template.source.encode())
+        _templates_digests[names] = digest.hexdigest()[:8]
+    return _templates_digests[names]
+
+
+def card_version(post):
+    """Хэш всего, что выводится в карточке публикации."""
+    category, location = post.category, post.location
+    parts = (
+        post.title, post.text, post.pub_date.isoformat(), post.is_published,
+        post.image.name, post.image_renditions.get('widths'),
+        post.comment_count, post.author.username,
+        category and (
+            category.pk, category.slug, category.title, category.is_published
+        ),
+        location and (location.pk, location.name, location.is_published),
+    )
+    return hashlib.md5(repr(parts).encode()).hexdigest()
+
+
+def render_post_card(post):
+    """Карточка для ленты: LRU процесса, затем общий кэш, затем рендер.
+
+    Карточка не зависит от посетителя, поэтому ключ — id и версия поста.
+    """
+    timeout = card_cache_timeout()
+    if not timeout:
+        return mark_safe(render_to_string(CARD_TEMPLATE, {'post': post}))
+    key = (
+        f'blog:card:{templates_digest(CARD_TEMPLATES)}:'
+        f'{post.pk}:{card_version(post)}'
+    )
+    html = card_lru.get(key)
+    if html is None:
+        html = cache.get(key)
+        if html is None:
+            html = render_to_string(CARD_TEMPLATE, {'post': post})
+            cache.set(key, html, timeout)
+        card_lru.set(key, html)
+    return mark_safe(html)
@@ -0,0 +1,18 @@
+from django.core.checks import Warning, register
+
+from .cache import cache_is_shared, feed_cache_timeout
+
+
+@register()
+def check_feed_cache_backend(app_configs, **kwargs):
+    # Сигналы сбрасывают поколения только в кэше своего процесса:
+    # остальные воркеры отдают удалённые и снятые с публикации посты,
+    # пока не истечёт BLOG_FEED_CACHE_TIMEOUT.
+    if not feed_cache_timeout() or cache_is_shared():
+        return []
+    return [Warning(
+        'Кэш ленты включён, но кэш по умолчанию у каждого процесса свой.',
+        hint='Настройте в CACHES общий бэкенд (файлы, база, Redis) '
+             'или выключите BLOG_FEED_CACHE_TIMEOUT.',
+        id='blog.W001',
+    )]
@@ -0,0 +1,33 @@
+from django.db.models import (
+    Count, F, IntegerField, OuterRef, Subquery, Value
+)
+from django.db.models.functions import Coalesce
+
+from .models import Comment, Post
+
+
+def actual_comment_count():
+    """Выражение с реальным числом комментариев поста для update/annotate."""
+    counts = Comment.objects.filter(
+        post=OuterRef('pk')
+    ).order_by().values('post').annotate(total=Count('pk')).values('total')
+    return Coalesce(
+        Subquery(counts, output_field=IntegerField()),
+        Value(0),
+    )
+
+
+def find_comment_count_mismatches(posts=None):
+    """Возвращает [(post_id, хранимое, реальное), ...] для рассинхронов."""
+    posts = Post.objects.all() if posts is None else posts
+    return list(
+        posts.annotate(actual=actual_comment_count()).exclude(
+            comment_count=F('actual')
+        ).order_by('pk').values_list('pk', 'comment_count', 'actual')
+    )
+
+
+def rebuild_comment_counts(posts=None):
+    """Пересчитывает счётчики одним UPDATE; возвращает число строк."""
+    posts = Post.objects.all() if posts is None else posts
+    return posts.update(comment_count=actual_comment_count())
@@ -0,0 +1,180 @@
+"""RSS, Atom и JSON Feed для ленты, категорий и авторов.
+
+Публикации берутся через filter_posts(), как на HTML-страницах.
+ETag считается по дате последней публикации (и поколению ленты из
+blog.cache, если сброс кэша включён) одним запросом по индексу: опрос
+неизменившейся ленты получает 304 без рендера. Тело выдаётся потоком
+по мере чтения публикаций и заодно складывается в кэш под этим ETag,
+так что следующие подписчики получают готовые байты.
+"""
+import hashlib
+import json
+from xml.sax.saxutils import escape, quoteattr
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.feedgenerator import rfc2822_date, rfc3339_date
+from django.utils.http import http_date, quote_etag
+
+from .cache import KEY_PREFIX, get_generation, invalidation_enabled
+
+CONTENT_TYPES = {
+    'rss': 'application/rss+xml; charset=utf-8',
+    'atom': 'application/atom+xml; charset=utf-8',
+    'json': 'application/feed+json; charset=utf-8',
+}
+
+
+def feed_items():
+    return getattr(settings, 'BLOG_SYNDICATION_ITEMS', 20)
+
+
+def feed_cache_timeout():
+    return getattr(settings, 'BLOG_SYNDICATION_CACHE_TIMEOUT', 300)
+
+
+class Channel:
+    """Описание одной ленты: заголовок, ссылки и выборка публикаций."""
+
+    def __init__(self, request, fmt, scope, title, link, posts):
+        self.request = request
+        self.fmt = fmt
+        self.scope = scope
+        self.title = title
+        self.link = request.build_absolute_uri(link)
+        self.self_link = request.build_absolute_uri(request.path)
+        self.posts = posts
+        self.updated = None
+
+    def validators(self):
+        latest = self.posts.values_list('pub_date', 'pk').first()
+        if latest:
+            self.updated = latest[0]
+        generation = get_generation(self.scope) if (
+            invalidation_enabled()
+        ) else ''
+        etag = hashlib.md5('|'.join(map(str, (
+            self.scope, self.fmt, latest, generation, self.self_link,
+        ))).encode()).hexdigest()
+        last_modified = int(self.updated.timestamp()) if latest else None
+        return quote_etag(etag), last_modified
+
+    def items(self):
+        posts = self.posts[:feed_items()]
+        for post in posts.iterator(chunk_size=feed_items()):
+            yield post, self.request.build_absolute_uri(
+                reverse('blog:post_detail', args=[post.pk])
+            )
+
+    def render(self):
+        return getattr(self, f'render_{self.fmt}')(self.updated)
+
+    def render_rss(self, updated):
+        yield (
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">'
+            f'<channel><title>{escape(self.title)}</title>'
+            f'<link>{escape(self.link)}</link>'
+            f'<description>{escape(self.title)}</description>'
+            '<language>ru</language>'
+            f'<atom:link href={quoteattr(self.self_link)} rel="self"/>'
+        )
+        if updated:
+            yield f'<lastBuildDate>{rfc2822_date(updated)}</lastBuildDate>'
+        for post, url in self.items():
+            yield (
+                f'<item><title>{escape(post.title)}</title>'
+                f'<link>{escape(url)}</link>'
+                f'<guid isPermaLink="true">{escape(url)}</guid>'
+                f'<pubDate>{rfc2822_date(post.pub_date)}</pubDate>'
+                f'<category>{escape(post.category.title)}</category>'
+                f'<description>{escape(post.text)}</description></item>'
+            )
+        yield '</channel></rss>'
+
+    def render_atom(self, updated):
+        yield (
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            '<feed xmlns="http://www.w3.org/2005/Atom" xml:lang="ru">'
+            f'<title>{escape(self.title)}</title>'
+            f'<link href={quoteattr(self.link)} rel="alternate"/>'
+            f'<link href={quoteattr(self.self_link)} rel="self"/>'
+            f'<id>{escape(self.self_link)}</id>'
+        )
+        if updated:
+            yield f'<updated>{rfc3339_date(updated)}</updated>'
+        for post, url in self.items():
+            yield (
+                f'<entry><title>{escape(post.title)}</title>'
+                f'<link href={quoteattr(url)} rel="alternate"/>'
+                f'<id>{escape(url)}</id>'
+                f'<published>{rfc3339_date(post.pub_date)}</published>'
+                f'<updated>{rfc3339_date(post.pub_date)}</updated>'
+                f'<author><name>{escape(post.author.username)}</name>'
+                f'</author>'
+                f'<category term={quoteattr(post.category.title)}/>'
+                f'<summary>{escape(post.text)}</summary></entry>'
+            )
+        yield '</feed>'
+
+    def render_json(self, updated):
+        yield json.dumps({
+            'version': 'https://jsonfeed.org/version/1.1',
+            'title': self.title,
+            'home_page_url': self.link,
+            'feed_url': self.self_link,
+            'language': 'ru',
+        }, ensure_ascii=False)[:-1] + ', "items": ['
+        separator = ''
+        for post, url in self.items():
+            yield separator + json.dumps({
+                'id': url,
+                'url': url,
+                'title': post.title,
+                'content_text': post.text,
+                'date_published': post.pub_date.isoformat(),
+                'authors': [{'name': post.author.username}],
+                'tags': [post.category.title],
+            }, ensure_ascii=False)
+            separator = ', '
+        yield ']}'
+
+
+def _stream_and_store(chunks, key, timeout):
+    """Отдаёт куски и по завершении кладёт всё тело в кэш."""
+    body = []
+    for chunk in chunks:
+        data = chunk.encode()
+        body.append(data)
+        yield data
+    if timeout:
+        cache.set(key, b''.join(body), timeout)
+
+
+def feed_response(channel):
+    if channel.fmt not in CONTENT_TYPES:
+        raise Http404('Неизвестный формат ленты.')
+    etag, last_modified = channel.validators()
+    response = get_conditional_response(
+        channel.request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        key = f'{KEY_PREFIX}:syndication:{etag}'
+        timeout = feed_cache_timeout()
+        body = cache.get(key) if timeout else None
+        content_type = CONTENT_TYPES[channel.fmt]
+        if body is not None:
+            response = HttpResponse(body, content_type=content_type)
+        else:
+            response = StreamingHttpResponse(
+                _stream_and_store(channel.render(), key, timeout),
+                content_type=content_type,
+            )
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, public=True, max_age=feed_cache_timeout())
+    return response
@@ -0,0 +1,105 @@
+import os
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Count, F
+
+from .models import ImageBlob, Post
+from .storage import UPLOAD_TO, source_stem
+from .uploads import UPLOAD_DIR
+
+
+def image_storage():
+    return Post._meta.get_field('image').storage
+
+
+def add_reference(name):
+    if not name:
+        return
+    ImageBlob.objects.get_or_create(name=name)
+    ImageBlob.objects.filter(name=name).update(refcount=F('refcount') + 1)
+
+
+def drop_reference(name):
+    if name:
+        ImageBlob.objects.filter(name=name, refcount__gt=0).update(
+            refcount=F('refcount') - 1
+        )
+
+
+def rebuild_refcounts():
+    """Пересчитывает ссылки по таблице публикаций; возвращает число файлов."""
+    counts = Post.objects.exclude(image='').order_by().values(
+        'image'
+    ).annotate(total=Count('pk')).values_list('image', 'total')
+    blobs = [ImageBlob(name=name, refcount=total) for name, total in counts]
+    ImageBlob.objects.bulk_create(
+        blobs, batch_size=500, update_conflicts=True,
+        unique_fields=('name',), update_fields=('refcount',),
+    )
+    ImageBlob.objects.exclude(
+        name__in=Post.objects.values('image')
+    ).update(refcount=0)
+    return len(blobs)
+
+
+def _files(root, prefix=''):
+    for directory, _, files in os.walk(root):
+        for filename in files:
+            path = os.path.join(directory, filename)
+            name = os.path.relpath(path, root).replace(os.sep, '/')
+            yield prefix + name, os.path.getmtime(path)
+
+
+def collect_garbage(grace, dry_run=False, batch_size=500):
+    """Удаляет фото без ссылок вместе с их копиями для srcset.
+
+    Не трогает файлы моложе grace (секунды): их могли только что
+    загрузить под ещё не сохранённую публикацию. Возвращает имена
+    удалённых файлов.
+    """
+    storage = image_storage()
+    cutoff = time.time() - grace
+    groups = defaultdict(list)
+    for name, modified in _files(storage.path(UPLOAD_TO), UPLOAD_TO + '/'):
+        groups[source_stem(name)].append((name, modified))
+    candidates = [
+        stem for stem, files in groups.items()
+        if max(modified for _, modified in files) < cutoff
+    ]
+
+    removed = []
+    for start in range(0, len(candidates), batch_size):
+        batch = candidates[start:start + batch_size]
+        names = [name for stem in batch for name, _ in groups[stem]]
+        live = set(Post.objects.filter(image__in=names).values_list(
+            'image', flat=True
+        ))
+        live.update(ImageBlob.objects.filter(
+            name__in=names, refcount__gt=0
+        ).values_list('name', flat=True))
+        live_stems = {source_stem(name) for name in live}
+        doomed = [
+            name for stem in batch if stem not in live_stems
+            # Повторная загрузка того же фото обновляет mtime.
+            and max(
+                os.path.getmtime(storage.path(name))
+                for name, _ in groups[stem]
+            ) < cutoff
+            for name, _ in groups[stem]
+        ]
+        if not dry_run:
+            ImageBlob.objects.filter(name__in=doomed, refcount=0).delete()
+            for name in doomed:
+                storage.delete(name)
+        removed.extend(doomed)
+
+    # Недокачанные загрузки, оставшиеся после падения процесса.
+    uploads = os.path.join(settings.MEDIA_ROOT, UPLOAD_DIR)
+    for name, modified in _files(uploads, UPLOAD_DIR + '/'):
+        if modified < cutoff:
+            if not dry_run:
+                os.remove(os.path.join(settings.MEDIA_ROOT, name))
+            removed.append(name)
+    return removed
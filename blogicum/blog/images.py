@@ -0,0 +1,116 @@
+"""Уменьшенные копии Post.image для srcset.
+
+Копии лежат рядом с оригиналом: posts_images/ab/cd/abcd….jpg ->
+posts_images/ab/cd/abcd…_320w.webp, …_320w.jpg и т. д.
+Метаданные (EXIF) в копии не переносятся.
+"""
+import logging
+import os
+import queue
+import threading
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {'webp': ('WEBP', 'webp'), 'jpeg': ('JPEG', 'jpg')}
+
+
+def rendition_widths():
+    return getattr(settings, 'BLOG_IMAGE_RENDITION_WIDTHS', (320, 640, 1280))
+
+
+def rendition_name(name, width, fmt):
+    stem, _ = os.path.splitext(name)
+    return f'{stem}_{width}w.{FORMATS[fmt][1]}'
+
+
+def build_renditions(image_field):
+    """Сохраняет копии по ширинам уже, чем оригинал.
+
+    Возвращает значение для Post.image_renditions.
+    """
+    storage, name = image_field.storage, image_field.name
+    with storage.open(name) as source:
+        original = ImageOps.exif_transpose(Image.open(source))
+        original.load()
+    widths = [width for width in rendition_widths() if width < original.width]
+    for width in widths:
+        height = round(original.height * width / original.width)
+        resized = original.resize((width, height), Image.LANCZOS)
+        for fmt, (pil_format, _) in FORMATS.items():
+            image = resized
+            if pil_format == 'JPEG' and image.mode != 'RGB':
+                image = image.convert('RGB')
+            buffer = BytesIO()
+            image.save(buffer, pil_format, quality=80, optimize=True)
+            storage.save_rendition(
+                rendition_name(name, width, fmt),
+                ContentFile(buffer.getvalue()),
+            )
+    return {'name': name, 'width': original.width, 'widths': widths}
+
+
+def renditions_are_stale(post):
+    return bool(post.image) and (
+        post.image_renditions.get('name') != post.image.name
+    )
+
+
+def update_renditions(post_id):
+    from .models import Post
+
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None or not renditions_are_stale(post):
+        return
+    renditions = build_renditions(post.image)
+    # Если картинку успели заменить, результат устарел — не пишем.
+    Post.objects.filter(pk=post_id, image=renditions['name']).update(
+        image_renditions=renditions
+    )
+
+
+_jobs = queue.Queue()
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def _work():
+    while True:
+        post_id = _jobs.get()
+        try:
+            update_renditions(post_id)
+        except Exception:
+            logger.exception('Не удалось сделать копии картинки %s', post_id)
+        finally:
+            close_old_connections()
+            _jobs.task_done()
+
+
+def _enqueue(post_id):
+    global _worker
+    if not getattr(settings, 'BLOG_IMAGE_RENDITIONS_ASYNC', True):
+        update_renditions(post_id)
+        return
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(
+                target=_work, name='image-renditions', daemon=True
+            )
+            _worker.start()
+    _jobs.put(post_id)
+
+
+def schedule_renditions(post):
+    """Ставит пересборку копий в фоновую очередь после коммита."""
+    if renditions_are_stale(post):
+        transaction.on_commit(lambda: _enqueue(post.pk))
+
+
+def wait_for_renditions():
+    """Дожидается фоновой очереди (для тестов и команд)."""
+    _jobs.join()
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from blog.images import renditions_are_stale, update_renditions
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Строит уменьшенные копии картинок публикаций, где их нет.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Пересобрать копии у всех публикаций с картинкой.',
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='').only(
+            'pk', 'image', 'image_renditions'
+        )
+        if options['force']:
+            posts.update(image_renditions={})
+        built = 0
+        for post in posts.iterator():
+            if options['force'] or renditions_are_stale(post):
+                update_renditions(post.pk)
+                built += 1
+        self.stdout.write(self.style.SUCCESS(f'Обработано картинок: {built}'))
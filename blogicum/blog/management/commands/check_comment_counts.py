@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.comment_counts import (
+    find_comment_count_mismatches,
+    rebuild_comment_counts
+)
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Проверяет, что Post.comment_count совпадает с числом комментариев.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Пересчитать счётчики у найденных публикаций.',
+        )
+
+    def handle(self, *args, **options):
+        mismatches = find_comment_count_mismatches()
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS('Счётчики согласованы.'))
+            return
+        for post_id, stored, actual in mismatches:
+            self.stdout.write(
+                f'Публикация {post_id}: сохранено {stored}, на деле {actual}'
+            )
+        if options['fix']:
+            rebuild_comment_counts(
+                Post.objects.filter(pk__in=[row[0] for row in mismatches])
+            )
+            self.stdout.write(
+                self.style.SUCCESS(f'Исправлено: {len(mismatches)}')
+            )
+            return
+        raise CommandError(f'Рассинхронизировано: {len(mismatches)}')
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from blog.image_blobs import collect_garbage, rebuild_refcounts
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет фото публикаций, на которые не ссылается ни одна '
+        'публикация, вместе с их уменьшенными копиями.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace', type=int, default=60 * 60,
+            help='Не удалять файлы моложе стольких секунд.',
+        )
+        parser.add_argument(
+            '--recount', action='store_true',
+            help='Сначала пересчитать ссылки по таблице публикаций.',
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать, что будет удалено.',
+        )
+
+    def handle(self, *args, **options):
+        if options['recount']:
+            counted = rebuild_refcounts()
+            self.stdout.write(f'Пересчитаны ссылки на {counted} файлов.')
+        removed = collect_garbage(options['grace'], options['dry_run'])
+        for name in removed:
+            self.stdout.write(f'  {name}')
+        verb = 'Будет удалено' if options['dry_run'] else 'Удалено'
+        self.stdout.write(self.style.SUCCESS(f'{verb} файлов: {len(removed)}'))
@@ -0,0 +1,142 @@
+import heapq
+import time
+from datetime import timedelta
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.cache import cache_is_shared, invalidate_feed
+from blog.models import Post
+from blog.visibility import horizon_bucket, visible_at
+
+
+class Command(BaseCommand):
+    help = (
+        'Следит за отложенными публикациями: в момент появления поста '
+        'в ленте сбрасывает и заново прогревает ленту, страницу '
+        'категории и профиль автора.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rescan', type=int, default=60,
+            help='Как часто перечитывать расписание из базы, в секундах.',
+        )
+        parser.add_argument(
+            '--lookahead', type=int, default=24 * 60 * 60,
+            help='На сколько секунд вперёд держать публикации в очереди.',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Обработать публикации, появившиеся за последние '
+                 '--rescan секунд, и выйти (для запуска из cron).',
+        )
+        parser.add_argument(
+            '--base-url',
+            default=getattr(settings, 'BLOG_WARMUP_BASE_URL', ''),
+            help='Адрес запущенного сайта для прогрева страниц; '
+                 'пустой — только сброс кэша.',
+        )
+
+    def handle(self, *args, **options):
+        # Сброс поколений в кэше своего процесса воркеры не увидят.
+        if not cache_is_shared():
+            raise CommandError(
+                'Кэш по умолчанию у каждого процесса свой: сброс ленты '
+                'не дойдёт до воркеров. Настройте общий бэкенд в CACHES.'
+            )
+        self.heap = []
+        self.scheduled = {}
+        self.fired = {}
+        self.base_url = options['base_url'].rstrip('/')
+        rescan = timedelta(seconds=options['rescan'])
+        lookahead = timedelta(seconds=options['lookahead'])
+        now = timezone.now()
+
+        if options['once']:
+            self.schedule(now - rescan, now)
+            self.publish_due(now)
+            return
+
+        since, next_rescan = now, now
+        while True:
+            now = timezone.now()
+            if now >= next_rescan:
+                close_old_connections()
+                self.schedule(since, now + lookahead)
+                since, next_rescan = now, now + rescan
+            self.publish_due(now)
+            wake_at = min(self.heap[0][0], next_rescan) if self.heap else (
+                next_rescan
+            )
+            time.sleep(max((wake_at - timezone.now()).total_seconds(), 0))
+
+    def schedule(self, since, until):
+        """Кладёт в кучу посты, которые станут видимы в (since, until]."""
+        # Окно пересканирования захватывает уже сработавшие посты:
+        # их помним, пока момент появления не выйдет из окна.
+        self.fired = {
+            pk: fire_at for pk, fire_at in self.fired.items()
+            if fire_at > since
+        }
+        bucket = timedelta(seconds=horizon_bucket())
+        upcoming = Post.objects.filter(
+            is_published=True,
+            pub_date__gte=since - bucket,
+            pub_date__lte=until,
+        ).values_list('pk', 'pub_date')
+        for pk, pub_date in upcoming.iterator():
+            fire_at = visible_at(pub_date)
+            if since < fire_at and fire_at not in (
+                self.scheduled.get(pk), self.fired.get(pk)
+            ):
+                self.scheduled[pk] = fire_at
+                heapq.heappush(self.heap, (fire_at, pk))
+
+    def publish_due(self, now):
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            fire_at, pk = heapq.heappop(self.heap)
+            # Пост могли перенести: устаревшие записи кучи пропускаем.
+            if self.scheduled.get(pk) == fire_at:
+                del self.scheduled[pk]
+                self.fired[pk] = fire_at
+                due.append(pk)
+        if due:
+            self.publish(due)
+
+    def publish(self, post_ids):
+        posts = Post.objects.select_related('author', 'category').filter(
+            pk__in=post_ids, is_published=True
+        )
+        urls = {reverse('blog:index')}
+        slugs, author_ids = set(), set()
+        for post in posts:
+            author_ids.add(post.author_id)
+            urls.add(reverse('blog:profile', args=[post.author.username]))
+            if post.category and post.category.is_published:
+                slugs.add(post.category.slug)
+                urls.add(
+                    reverse('blog:category_posts', args=[post.category.slug])
+                )
+            self.stdout.write(f'Опубликовано: #{post.pk} «{post}»')
+        invalidate_feed(*slugs, author_ids=author_ids, counts=True)
+        if self.base_url:
+            for url in sorted(urls):
+                self.stdout.write(f'  прогрев {url}: {self.warm(url)}')
+
+    def warm(self, url):
+        """GET к запущенному сайту без cookie, как у анонимного читателя."""
+        try:
+            with urlopen(Request(self.base_url + url), timeout=10) as response:
+                response.read()
+                return response.status
+        except HTTPError as error:
+            return error.code
+        except URLError as error:
+            return f'ошибка ({error.reason})'
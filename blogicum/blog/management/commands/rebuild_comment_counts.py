@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from blog.comment_counts import rebuild_comment_counts
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает Post.comment_count по таблице комментариев.'
+
+    def handle(self, *args, **options):
+        updated = rebuild_comment_counts()
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано публикаций: {updated}')
+        )
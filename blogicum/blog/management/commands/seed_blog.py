@@ -0,0 +1,63 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.seeding import seed_blog
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическим блогом для бенчмарков: '
+        'пользователи, категории, места, публикации и комментарии '
+        'с неравномерным распределением.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=50)
+        parser.add_argument('--locations', type=int, default=200)
+        parser.add_argument('--posts', type=int, default=100_000)
+        parser.add_argument('--comments', type=int, default=300_000)
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Зерно генератора: одинаковое зерно — одинаковые данные.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Строк в одном bulk_create и одной транзакции.',
+        )
+        parser.add_argument(
+            '--prefix', default='seed',
+            help='Префикс имён пользователей и slug категорий.',
+        )
+        parser.add_argument(
+            '--password', default='blogicum',
+            help='Пароль всех созданных пользователей.',
+        )
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='За сколько дней в прошлом разбросать публикации.',
+        )
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        if get_user_model().objects.filter(
+            username__startswith=f'{prefix}-user'
+        ).exists():
+            raise CommandError(
+                f'Данные с префиксом «{prefix}» уже есть: '
+                'укажите другой --prefix или очистите базу.'
+            )
+        seed_blog(
+            users=options['users'],
+            categories=options['categories'],
+            locations=options['locations'],
+            posts=options['posts'],
+            comments=options['comments'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            prefix=prefix,
+            password=options['password'],
+            days=options['days'],
+            log=self.stdout.write,
+        )
+        self.stdout.write(self.style.SUCCESS('Готово.'))
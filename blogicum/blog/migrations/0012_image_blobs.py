@@ -0,0 +1,46 @@
+# Generated by Django 4.2.23 on 2026-10-18 02:29
+
+import blog.storage
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_image_blobs(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    ImageBlob = apps.get_model('blog', 'ImageBlob')
+    counts = Post.objects.exclude(image='').order_by().values(
+        'image'
+    ).annotate(total=Count('pk')).values_list('image', 'total')
+    ImageBlob.objects.bulk_create(
+        (ImageBlob(name=name, refcount=total) for name, total in counts),
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_post_image_renditions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Файл')),
+                ('refcount', models.PositiveIntegerField(default=0, verbose_name='Число ссылок')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Добавлено')),
+            ],
+            options={
+                'verbose_name': 'файл фото',
+                'verbose_name_plural': 'Файлы фото',
+            },
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, storage=blog.storage.post_images_storage, upload_to='posts_images', verbose_name='Фото'),
+        ),
+        migrations.RunPython(fill_image_blobs, migrations.RunPython.noop),
+    ]
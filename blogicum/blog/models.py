@@ -1,6 +1,8 @@
 from django.contrib.auth import get_user_model
 from django.db import models
 
+from .storage import UPLOAD_TO, post_images_storage
+
 
 User = get_user_model()
 
@@ -95,12 +97,51 @@ class Post(PublishedModel):
         blank=False,
         related_name='posts'
     )
-    image = models.ImageField('Фото', upload_to='posts_images', blank=True)
+    image = models.ImageField(
+        'Фото',
+        upload_to=UPLOAD_TO,
+        storage=post_images_storage,
+        blank=True
+    )
+    # {'name': оригинал, 'width': его ширина, 'widths': [ширины копий]},
+    # заполняет blog.images.
+    image_renditions = models.JSONField(
+        'Копии фото',
+        default=dict,
+        blank=True,
+        editable=False
+    )
+    comment_count = models.PositiveIntegerField(
+        'Число комментариев',
+        default=0,
+        editable=False
+    )
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date',)
+        # Под пути доступа filter_posts(): лента, категория, профиль.
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'),
+                condition=models.Q(is_published=True),
+                name='post_published_feed_idx',
+            ),
+            models.Index(
+                fields=('category', '-pub_date', '-id'),
+                condition=models.Q(is_published=True),
+                name='post_category_feed_idx',
+            ),
+            models.Index(
+                fields=('is_published', '-pub_date'),
+                name='post_is_published_date_idx',
+            ),
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='post_author_feed_idx',
+            ),
+        )
 
     def __str__(self):
         return self.title[:30]
@@ -118,3 +159,18 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('created_at',)
+
+
+class ImageBlob(models.Model):
+    """Файл фото и число публикаций, которые на него ссылаются."""
+
+    name = models.CharField('Файл', max_length=255, unique=True)
+    refcount = models.PositiveIntegerField('Число ссылок', default=0)
+    created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'файл фото'
+        verbose_name_plural = 'Файлы фото'
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,184 @@
+import base64
+import binascii
+from datetime import datetime
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.http import Http404
+from django.utils.functional import cached_property
+
+from .cache import cached_count
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(direction, moment, pk):
+    raw = f'{direction}|{moment.isoformat()}|{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    padded = token + '=' * (-len(token) % 4)
+    try:
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        direction, pub_date, pk = raw.split('|')
+        pub_date, pk = datetime.fromisoformat(pub_date), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor(token)
+    if direction not in (CursorPaginator.OLDER, CursorPaginator.NEWER):
+        raise InvalidCursor(token)
+    return direction, pub_date, pk
+
+
+class CursorPage:
+    """Страница ленты, выбранная по ключу (pub_date, id) без OFFSET."""
+
+    is_cursor = True
+
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Keyset-пагинация по (-pub_date, -id).
+
+    Любая страница достаётся одним запросом с LIMIT, без COUNT(*)
+    и без пропуска строк через OFFSET.
+    """
+
+    OLDER = 'o'
+    NEWER = 'n'
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = per_page
+
+    def page(self, token=None):
+        direction, pub_date, pk = (
+            decode_cursor(token) if token else (self.OLDER, None, None)
+        )
+        if direction == self.OLDER:
+            queryset = self.queryset.order_by('-pub_date', '-pk')
+            if pub_date is not None:
+                queryset = queryset.filter(
+                    Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+                )
+        else:
+            queryset = self.queryset.order_by('pub_date', 'pk').filter(
+                Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, pk__gt=pk)
+            )
+        posts = list(queryset[:self.per_page + 1])
+        has_more = len(posts) > self.per_page
+        posts = posts[:self.per_page]
+        if direction == self.NEWER:
+            posts.reverse()
+        if not posts:
+            return CursorPage(posts, None, None)
+        if direction == self.OLDER:
+            has_older, has_newer = has_more, pub_date is not None
+        else:
+            has_older, has_newer = True, has_more
+        oldest, newest = posts[-1], posts[0]
+        return CursorPage(
+            posts,
+            encode_cursor(self.OLDER, oldest.pub_date, oldest.pk)
+            if has_older else None,
+            encode_cursor(self.NEWER, newest.pub_date, newest.pk)
+            if has_newer else None,
+        )
+
+
+def comment_page(comments, per_page, token=None):
+    """Порция комментариев по (created_at, id) после курсора.
+
+    Комментарии идут от старых к новым, поэтому курсор «дальше» —
+    это NEWER. Сколько бы комментариев ни было у поста, читается
+    не больше per_page + 1 строк.
+    """
+    comments = comments.order_by('created_at', 'pk')
+    if token:
+        direction, created_at, pk = decode_cursor(token)
+        if direction != CursorPaginator.NEWER:
+            raise InvalidCursor(token)
+        comments = comments.filter(
+            Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk)
+        )
+    items = list(comments[:per_page + 1])
+    next_cursor = None
+    if len(items) > per_page:
+        last = items[per_page - 1]
+        next_cursor = encode_cursor(
+            CursorPaginator.NEWER, last.created_at, last.pk
+        )
+    return CursorPage(items[:per_page], next_cursor, None)
+
+
+class CursorPaginationMixin:
+    """Включает keyset-пагинацию для ListView.
+
+    Режим включается параметром ``?cursor=`` в запросе либо для всех
+    запросов настройкой ``BLOG_CURSOR_PAGINATION = True``.
+    """
+
+    cursor_kwarg = 'cursor'
+
+    def use_cursor_pagination(self):
+        return (
+            self.cursor_kwarg in self.request.GET
+            or getattr(settings, 'BLOG_CURSOR_PAGINATION', False)
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_cursor_pagination():
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(queryset, page_size)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor:
+            raise Http404('Неверный курсор страницы.')
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator, который берёт общее число из blog.cache.cached_count."""
+
+    def __init__(self, object_list, per_page, count_scope=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_scope = count_scope
+
+    @cached_property
+    def count(self):
+        if self.count_scope is None:
+            return super().count
+        return cached_count(self.count_scope, self.object_list)
+
+
+class CachedCountMixin:
+    """Подключает CachedCountPaginator к ListView с get_cache_scope()."""
+
+    paginator_class = CachedCountPaginator
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        return super().get_paginator(
+            queryset, per_page, count_scope=self.get_cache_scope(), **kwargs
+        )
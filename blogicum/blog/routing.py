@@ -0,0 +1,125 @@
+"""Чтение ленты с реплик, запись — в основную базу.
+
+Реплики перечисляются в BLOG_READ_REPLICAS (алиасы DATABASES). Читать
+с них разрешено только представлениям с ReplicaReadMixin или
+@replica_reads: лента, категория, пост и профиль. Всё остальное, включая
+любую запись, идёт в default.
+
+Чтобы автор сразу видел свою публикацию, а не отстающую реплику,
+ReadYourWritesMiddleware после запроса с записью ставит cookie:
+пока она жива (BLOG_REPLICA_PIN_SECONDS), этот браузер читает
+из default.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+PIN_COOKIE = 'blog_primary'
+
+_read_alias = ContextVar('blog_read_alias', default=None)
+_writes = ContextVar('blog_writes', default=None)
+
+
+def read_replicas():
+    return getattr(settings, 'BLOG_READ_REPLICAS', [])
+
+
+def pin_seconds():
+    return getattr(settings, 'BLOG_REPLICA_PIN_SECONDS', 10)
+
+
+def read_alias(request):
+    """Реплика для чтения в этом запросе или None — читать из default."""
+    replicas = read_replicas()
+    if (
+        not replicas
+        or request.method not in ('GET', 'HEAD')
+        or PIN_COOKIE in request.COOKIES
+    ):
+        return None
+    return random.choice(replicas)
+
+
+def bound_to_read_alias(queryset):
+    """Закрепляет выборку за текущей базой чтения.
+
+    Нужно потоковым ответам: их тело читается уже после выхода
+    из представления, когда контекст реплики снят.
+    """
+    return queryset.using(_read_alias.get())
+
+
+@contextmanager
+def reading_from(alias):
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def _render_on(request, view, *args, **kwargs):
+    with reading_from(read_alias(request)):
+        response = view(request, *args, **kwargs)
+        # Ленивые выборки в шаблоне тоже должны уйти на реплику.
+        if callable(getattr(response, 'render', None)) and not getattr(
+            response, 'is_rendered', True
+        ):
+            response.render()
+    return response
+
+
+def replica_reads(view):
+    """Декоратор функции-представления, читающей с реплики."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        return _render_on(request, view, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaReadMixin:
+
+    def dispatch(self, request, *args, **kwargs):
+        return _render_on(request, super().dispatch, *args, **kwargs)
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        writes = _writes.get()
+        if writes is not None:
+            writes.append(model)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *read_replicas()}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+
+class ReadYourWritesMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _writes.set([])
+        try:
+            response = self.get_response(request)
+            wrote = bool(_writes.get())
+        finally:
+            _writes.reset(token)
+        if wrote and read_replicas():
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=pin_seconds(),
+                httponly=True, samesite='Lax',
+            )
+        return response
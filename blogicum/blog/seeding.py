@@ -0,0 +1,254 @@
+"""Синтетический блог для профилирования и бенчмарков.
+
+seed_blog() создаёт пользователей, категории, места, публикации
+и комментарии через bulk_create пачками, каждая пачка — в своей
+транзакции, так что миллионы строк пишутся за минуты. Распределения
+неравномерные, как в живом блоге: немногие авторы пишут большую часть
+публикаций, немногие публикации собирают большую часть комментариев
+(закон Ципфа), часть публикаций отложена на будущее, часть категорий
+и мест снята с публикации.
+
+Одинаковый seed даёт одинаковые данные; даты отсчитываются от момента
+запуска. Сигналы при bulk_create не срабатывают, поэтому счётчики
+комментариев, поисковый индекс и поколения кэша ленты обновляются
+в конце отдельными шагами.
+"""
+import random
+import time
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from .cache import invalidate_feed
+from .comment_counts import rebuild_comment_counts
+from .models import Category, Comment, Location, Post
+from .search import rebuild_search_index
+
+WORDS = (
+    'утро', 'город', 'дорога', 'река', 'лес', 'поезд', 'книга', 'кофе',
+    'море', 'горы', 'дождь', 'снег', 'солнце', 'ветер', 'друзья', 'музей',
+    'парк', 'рынок', 'вечер', 'история', 'путешествие', 'фотография',
+    'рецепт', 'прогулка', 'концерт', 'выставка', 'мост', 'площадь',
+    'остров', 'маршрут', 'заметка', 'новость', 'отпуск', 'праздник',
+    'дача', 'озеро', 'кино', 'театр', 'спорт', 'велосипед', 'собака',
+    'кошка', 'сад', 'весна', 'лето', 'осень', 'зима', 'небо', 'звёзды',
+    'работа', 'проект', 'идея', 'встреча', 'письмо', 'память', 'дом',
+)
+PARAGRAPHS = 500
+COMMENT_TEXTS = 200
+
+# Доли «особых» строк.
+UNPUBLISHED_CATEGORIES = 0.1
+UNPUBLISHED_LOCATIONS = 0.1
+UNPUBLISHED_POSTS = 0.05
+SCHEDULED_POSTS = 0.03
+POSTS_WITHOUT_LOCATION = 0.3
+SCHEDULE_DAYS = 30
+
+# Показатели степени для закона Ципфа.
+AUTHOR_SKEW = 0.9
+CATEGORY_SKEW = 1.0
+POST_SKEW = 0.8
+
+
+def zipf_weights(n, exponent):
+    """Накопленные веса рангов 1..n для random.choices(cum_weights=...)."""
+    return list(accumulate(1 / rank ** exponent for rank in range(1, n + 1)))
+
+
+def _sentence(rng, low, high):
+    words = rng.choices(WORDS, k=rng.randint(low, high))
+    return ' '.join(words).capitalize() + '.'
+
+
+def _batches(total, batch_size):
+    for start in range(0, total, batch_size):
+        yield start, min(batch_size, total - start)
+
+
+def _bulk_create(model, objects, batch_size):
+    with transaction.atomic():
+        model.objects.bulk_create(objects, batch_size=batch_size)
+
+
+class Seeder:
+
+    def __init__(self, seed=0, batch_size=5000, prefix='seed',
+                 password='blogicum', days=365, log=None):
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.prefix = prefix
+        self.password = password
+        self.days = days
+        self.log = log or (lambda message: None)
+        self.now = timezone.now()
+        self.paragraphs = [
+            ' '.join(_sentence(self.rng, 5, 15) for _ in range(
+                self.rng.randint(2, 8)
+            ))
+            for _ in range(PARAGRAPHS)
+        ]
+        self.comment_texts = [
+            _sentence(self.rng, 3, 20) for _ in range(COMMENT_TEXTS)
+        ]
+
+    def _step(self, name, create, total):
+        started = time.perf_counter()
+        create(total)
+        self.log(f'{name}: {total} за {time.perf_counter() - started:.1f} с')
+
+    def _ids(self, model, **filters):
+        return list(
+            model.objects.filter(**filters).order_by('pk').values_list(
+                'pk', flat=True
+            )
+        )
+
+    def create_users(self, total):
+        User = get_user_model()
+        # Один хэш на всех: хэширование пароля дороже вставки строки.
+        password = make_password(self.password)
+        for start, size in _batches(total, self.batch_size):
+            _bulk_create(User, [
+                User(
+                    username=f'{self.prefix}-user{number}',
+                    password=password,
+                    email=f'{self.prefix}-user{number}@example.com',
+                )
+                for number in range(start, start + size)
+            ], self.batch_size)
+        self.user_ids = self._ids(
+            User, username__startswith=f'{self.prefix}-user'
+        )
+        # Популярные авторы — случайные пользователи, а не первые по id.
+        self.rng.shuffle(self.user_ids)
+        self.author_weights = zipf_weights(len(self.user_ids), AUTHOR_SKEW)
+
+    def create_categories(self, total):
+        _bulk_create(Category, [
+            Category(
+                title=_sentence(self.rng, 1, 3)[:-1],
+                description=_sentence(self.rng, 5, 20),
+                slug=f'{self.prefix}-{number}',
+                is_published=self.rng.random() >= UNPUBLISHED_CATEGORIES,
+            )
+            for number in range(total)
+        ], self.batch_size)
+        self.categories = list(
+            Category.objects.filter(
+                slug__startswith=f'{self.prefix}-'
+            ).order_by('pk').values_list('pk', 'slug')
+        )
+        self.rng.shuffle(self.categories)
+        self.category_weights = zipf_weights(
+            len(self.categories), CATEGORY_SKEW
+        )
+
+    def create_locations(self, total):
+        first = Location.objects.order_by('-pk').values_list(
+            'pk', flat=True
+        ).first() or 0
+        _bulk_create(Location, [
+            Location(
+                name=f'{_sentence(self.rng, 1, 2)[:-1]} {number}',
+                is_published=self.rng.random() >= UNPUBLISHED_LOCATIONS,
+            )
+            for number in range(total)
+        ], self.batch_size)
+        self.location_ids = self._ids(Location, pk__gt=first)
+
+    def _pub_date(self):
+        if self.rng.random() < SCHEDULED_POSTS:
+            return self.now + timedelta(
+                seconds=self.rng.uniform(60, SCHEDULE_DAYS * 86400)
+            )
+        # Свежих публикаций больше, чем старых.
+        return self.now - timedelta(
+            seconds=self.days * 86400 * self.rng.random() ** 2 + 60
+        )
+
+    def _location_id(self):
+        if not self.location_ids or (
+            self.rng.random() < POSTS_WITHOUT_LOCATION
+        ):
+            return None
+        return self.rng.choice(self.location_ids)
+
+    def create_posts(self, total):
+        first = Post.objects.order_by('-pk').values_list(
+            'pk', flat=True
+        ).first() or 0
+        rng = self.rng
+        for start, size in _batches(total, self.batch_size):
+            authors = rng.choices(
+                self.user_ids, cum_weights=self.author_weights, k=size
+            )
+            categories = rng.choices(
+                self.categories, cum_weights=self.category_weights, k=size
+            )
+            _bulk_create(Post, [
+                Post(
+                    title=f'{_sentence(rng, 2, 6)[:-1]} №{start + offset}',
+                    text=rng.choice(self.paragraphs),
+                    pub_date=self._pub_date(),
+                    author_id=authors[offset],
+                    category_id=categories[offset][0],
+                    location_id=self._location_id(),
+                    is_published=rng.random() >= UNPUBLISHED_POSTS,
+                )
+                for offset in range(size)
+            ], self.batch_size)
+        self.post_ids = self._ids(Post, pk__gt=first)
+        # «Горячие» публикации тоже разбросаны по ленте.
+        rng.shuffle(self.post_ids)
+        self.post_weights = zipf_weights(len(self.post_ids), POST_SKEW)
+
+    def create_comments(self, total):
+        if not self.post_ids:
+            return
+        rng = self.rng
+        for _, size in _batches(total, self.batch_size):
+            posts = rng.choices(
+                self.post_ids, cum_weights=self.post_weights, k=size
+            )
+            authors = rng.choices(
+                self.user_ids, cum_weights=self.author_weights, k=size
+            )
+            _bulk_create(Comment, [
+                Comment(
+                    text=rng.choice(self.comment_texts),
+                    post_id=posts[offset],
+                    author_id=authors[offset],
+                )
+                for offset in range(size)
+            ], self.batch_size)
+
+    def finish(self):
+        started = time.perf_counter()
+        rebuild_comment_counts()
+        indexed = rebuild_search_index()
+        invalidate_feed(
+            *(slug for _, slug in self.categories), counts=True
+        )
+        self.log(
+            f'Счётчики комментариев и поисковый индекс ({indexed}) '
+            f'за {time.perf_counter() - started:.1f} с'
+        )
+
+    def run(self, users, categories, locations, posts, comments):
+        self._step('Пользователи', self.create_users, max(users, 1))
+        self._step('Категории', self.create_categories, max(categories, 1))
+        self._step('Места', self.create_locations, locations)
+        self._step('Публикации', self.create_posts, posts)
+        self._step('Комментарии', self.create_comments, comments)
+        self.finish()
+
+
+def seed_blog(users=1000, categories=50, locations=200, posts=100_000,
+              comments=300_000, **options):
+    """Заполняет базу синтетическим блогом; см. Seeder."""
+    Seeder(**options).run(users, categories, locations, posts, comments)
@@ -0,0 +1,199 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F, QuerySet
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save
+)
+from django.dispatch import receiver
+
+from .cache import invalidate_feed, invalidation_enabled
+from .comment_counts import rebuild_comment_counts
+from .image_blobs import add_reference, drop_reference
+from .images import schedule_renditions
+from .models import Category, Comment, Location, Post
+from .search import index_posts, unindex_posts
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, raw, **kwargs):
+    # При loaddata счётчики пересчитывает rebuild_comment_counts.
+    if created and not raw:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1
+        )
+
+
+def _cascaded(origin):
+    """Комментарий удалён каскадом вместе с постом или автором.
+
+    Тогда обработчики комментариев ничего не делают: пост удалён
+    целиком, а после удаления пользователя счётчики пересчитывает
+    recount_user_comment_posts — один UPDATE вместо запроса
+    на каждый комментарий.
+    """
+    if origin is None:
+        return False
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model is not Comment
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, origin=None, **kwargs):
+    if _cascaded(origin):
+        return
+    Post.objects.filter(pk=instance.post_id, comment_count__gt=0).update(
+        comment_count=F('comment_count') - 1
+    )
+
+
+@receiver(pre_delete, sender=get_user_model())
+def remember_user_comment_posts(sender, instance, **kwargs):
+    instance._commented_post_ids = list(
+        Comment.objects.filter(author=instance).exclude(
+            post__author=instance
+        ).values_list('post_id', flat=True).distinct()
+    )
+
+
+@receiver(post_delete, sender=get_user_model())
+def recount_user_comment_posts(sender, instance, **kwargs):
+    post_ids = getattr(instance, '_commented_post_ids', ())
+    if not post_ids:
+        return
+    posts = Post.objects.filter(pk__in=post_ids)
+    rebuild_comment_counts(posts)
+    if invalidation_enabled():
+        invalidate_feed(*posts.values_list(
+            'category__slug', flat=True
+        ).distinct())
+
+
+def _post_category_slugs(**filters):
+    return Post.objects.filter(**filters).values_list(
+        'category__slug', flat=True
+    ).distinct()
+
+
+# Первое поле — slug категории, остальные задают состав выборок:
+# их смена сбрасывает и число публикаций для пагинатора.
+_MEMBERSHIP_FIELDS = {
+    Post: (
+        'category__slug', 'is_published', 'pub_date', 'category_id',
+        'author_id',
+    ),
+    Category: ('slug', 'is_published'),
+}
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_save, sender=Category)
+def remember_old_category(sender, instance, raw, **kwargs):
+    # Публикация могла сменить категорию, а категория — slug:
+    # старые страницы тоже нужно сбросить.
+    if raw or instance.pk is None or not invalidation_enabled():
+        return
+    old = sender.objects.filter(pk=instance.pk).values_list(
+        *_MEMBERSHIP_FIELDS[sender]
+    ).first()
+    if old is not None:
+        instance._feed_cache_old_slugs = [old[0]]
+        instance._feed_cache_old_membership = old[1:]
+
+
+def _membership_changed(instance, signal, created=False, **kwargs):
+    if signal is post_delete or created:
+        return True
+    fields = _MEMBERSHIP_FIELDS[type(instance)][1:]
+    return getattr(instance, '_feed_cache_old_membership', None) != tuple(
+        getattr(instance, field) for field in fields
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_feeds(sender, instance, signal, **kwargs):
+    if not invalidation_enabled():
+        return
+    slug = instance.category.slug if instance.category_id else None
+    old_author_id = getattr(
+        instance, '_feed_cache_old_membership', (None,)
+    )[-1]
+    invalidate_feed(
+        slug,
+        *getattr(instance, '_feed_cache_old_slugs', ()),
+        author_ids=(instance.author_id, old_author_id),
+        counts=_membership_changed(instance, signal, **kwargs),
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_feeds(sender, instance, origin=None, **kwargs):
+    # В карточке публикации выводится число комментариев.
+    if not invalidation_enabled() or _cascaded(origin):
+        return
+    invalidate_feed(*_post_category_slugs(pk=instance.post_id))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_feeds(sender, instance, signal, **kwargs):
+    if not invalidation_enabled():
+        return
+    invalidate_feed(
+        instance.slug, *getattr(instance, '_feed_cache_old_slugs', ()),
+        counts=_membership_changed(instance, signal, **kwargs),
+    )
+
+
+@receiver(post_save, sender=Location)
+@receiver(pre_delete, sender=Location)
+def invalidate_location_feeds(sender, instance, **kwargs):
+    # pre_delete: после удаления у публикаций уже location = NULL.
+    if not invalidation_enabled():
+        return
+    invalidate_feed(*_post_category_slugs(location=instance))
+
+
+@receiver(post_save, sender=Post)
+def refresh_image_renditions(sender, instance, raw, **kwargs):
+    if not raw:
+        schedule_renditions(instance)
+
+
+@receiver(pre_save, sender=Post)
+def remember_old_image(sender, instance, raw, **kwargs):
+    if not raw and instance.pk is not None:
+        instance._old_image_name = Post.objects.filter(
+            pk=instance.pk
+        ).values_list('image', flat=True).first()
+
+
+@receiver(post_save, sender=Post)
+def count_image_references(sender, instance, created, raw, **kwargs):
+    # При loaddata ссылки пересчитывает gc_post_images --recount.
+    if raw:
+        return
+    old_name = getattr(instance, '_old_image_name', None)
+    if created or old_name != instance.image.name:
+        drop_reference(old_name)
+        add_reference(instance.image.name)
+
+
+@receiver(post_delete, sender=Post)
+def drop_image_reference(sender, instance, **kwargs):
+    drop_reference(instance.image.name)
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, raw, using, **kwargs):
+    # После loaddata индекс пересобирает rebuild_search_index.
+    if not raw:
+        index_posts(instance, using=using)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, using, **kwargs):
+    unindex_posts(instance.pk, using=using)
@@ -0,0 +1,79 @@
+"""Хранилище фото публикаций с адресацией по содержимому.
+
+Файл сохраняется под именем из SHA-256 содержимого:
+posts_images/ab/cd/abcd….jpg. Одинаковые фото хранятся один раз,
+а число ссылающихся на них публикаций ведёт модель ImageBlob.
+Неиспользуемые файлы удаляет команда gc_post_images.
+"""
+import hashlib
+import os
+import posixpath
+import re
+
+from django.core.files.storage import FileSystemStorage
+
+UPLOAD_TO = 'posts_images'
+BLOB_NAME = re.compile(
+    rf'^{UPLOAD_TO}/([0-9a-f]{{2}})/([0-9a-f]{{2}})/\1\2[0-9a-f]{{60}}'
+)
+# Копии из blog.images: <stem>_<ширина>w.<формат>.
+RENDITION_SUFFIX = re.compile(r'_\d+w$')
+
+
+def content_hash(content):
+    """SHA-256 файла; загрузчик считает его заранее, по ходу приёма."""
+    digest = getattr(content, 'sha256', None)
+    if digest:
+        return digest
+    hasher = hashlib.sha256()
+    content.seek(0)
+    for chunk in content.chunks():
+        hasher.update(chunk)
+    content.seek(0)
+    return hasher.hexdigest()
+
+
+def blob_name(digest, ext):
+    return posixpath.join(
+        UPLOAD_TO, digest[:2], digest[2:4], digest + ext.lower()
+    )
+
+
+def source_stem(name):
+    """Общая часть имени оригинала и его копий."""
+    stem, _ = posixpath.splitext(name)
+    return RENDITION_SUFFIX.sub('', stem)
+
+
+class ContentAddressedStorage(FileSystemStorage):
+
+    def _save(self, name, content):
+        if BLOB_NAME.match(name):
+            # Уже адресованные файлы.
+            return super()._save(name, content)
+        _, ext = os.path.splitext(name)
+        name = blob_name(content_hash(content), ext)
+        if self.exists(name):
+            # Свежий mtime защищает файл от gc_post_images, пока
+            # новая ссылка на него не сохранена.
+            os.utime(self.path(name))
+            return name
+        # Если тот же файл параллельно сохранил другой запрос,
+        # FileSystemStorage добавит к имени суффикс: выйдет дубль,
+        # но не потеря.
+        return super()._save(name, content)
+
+    def save_rendition(self, name, content):
+        """Сохраняет копию для srcset под именем из rendition_name().
+
+        Копия лежит рядом с оригиналом без хэширования: image_srcset
+        ищет её по имени оригинала, в том числе у фото, загруженных
+        до адресации по содержимому (posts_images/foo.jpg).
+        """
+        if self.exists(name):
+            self.delete(name)
+        return super()._save(name, content)
+
+
+def post_images_storage():
+    return ContentAddressedStorage()
@@ -0,0 +1,38 @@
+from django import template
+
+from blog.cache import render_post_card
+from blog.images import rendition_name
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_card(post):
+    return render_post_card(post)
+
+
+@register.simple_tag
+def elided_page_range(page_obj, on_each_side=2, on_ends=1):
+    """Номера страниц вокруг текущей и по краям, с «…» между ними.
+
+    Число ссылок не зависит от общего числа страниц.
+    """
+    return page_obj.paginator.get_elided_page_range(
+        page_obj.number, on_each_side=on_each_side, on_ends=on_ends
+    )
+
+
+@register.simple_tag
+def image_srcset(post, fmt):
+    """Значение srcset из копий Post.image в формате fmt или ''."""
+    renditions = post.image_renditions
+    if not post.image or renditions.get('name') != post.image.name:
+        return ''
+    storage = post.image.storage
+    candidates = [
+        f'{storage.url(rendition_name(post.image.name, width, fmt))} {width}w'
+        for width in renditions['widths']
+    ]
+    if candidates and fmt == 'jpeg':
+        candidates.append(f"{post.image.url} {renditions['width']}w")
+    return ', '.join(candidates)
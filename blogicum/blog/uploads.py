@@ -0,0 +1,137 @@
+"""Потоковая загрузка фото публикаций с ограничениями по размеру."""
+import hashlib
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import (
+    FileUploadHandler,
+    SkipFile,
+    StopFutureHandlers
+)
+from PIL import Image, ImageFile
+
+IMAGE_FIELDS = ('image',)
+ALLOWED_FORMATS = ('JPEG', 'PNG', 'GIF', 'WEBP')
+UPLOAD_DIR = '.uploads'
+
+
+def max_bytes():
+    return getattr(settings, 'BLOG_IMAGE_MAX_BYTES', 10 * 1024 * 1024)
+
+
+def max_pixels():
+    return getattr(settings, 'BLOG_IMAGE_MAX_PIXELS', 40_000_000)
+
+
+def header_bytes():
+    return getattr(settings, 'BLOG_IMAGE_HEADER_BYTES', 256 * 1024)
+
+
+def upload_errors(request):
+    """Причины, по которым фото из запроса были отброшены, по полям."""
+    return getattr(request, '_image_upload_errors', {})
+
+
+class MediaUploadedFile(TemporaryUploadedFile):
+    """Временный файл внутри MEDIA_ROOT.
+
+    Хранилище переносит его на место переименованием, без копирования.
+    """
+
+    def __init__(self, name, content_type, size, charset,
+                 content_type_extra=None):
+        directory = os.path.join(settings.MEDIA_ROOT, UPLOAD_DIR)
+        os.makedirs(directory, exist_ok=True)
+        _, ext = os.path.splitext(name)
+        file = tempfile.NamedTemporaryFile(
+            suffix='.upload' + ext, dir=directory
+        )
+        super(TemporaryUploadedFile, self).__init__(
+            file, name, content_type, size, charset, content_type_extra
+        )
+
+
+class ImageUploadHandler(FileUploadHandler):
+    """Пишет фото сразу на диск и проверяет его по ходу загрузки.
+
+    Размер считается по мере прихода данных, а формат и число пикселей
+    берутся из заголовка, без декодирования всего изображения. Если фото
+    не подходит, остаток файла пропускается, а причина сохраняется
+    для формы (см. upload_errors).
+    """
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.activated = field_name in IMAGE_FIELDS
+        if not self.activated:
+            return
+        if self.content_length and self.content_length > max_bytes():
+            self.reject(self.too_large_message())
+        self.file = MediaUploadedFile(
+            self.file_name, self.content_type, 0, self.charset,
+            self.content_type_extra
+        )
+        self.parser = ImageFile.Parser()
+        self.header_checked = False
+        self.hasher = hashlib.sha256()
+        raise StopFutureHandlers()
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.activated:
+            return raw_data
+        if start + len(raw_data) > max_bytes():
+            self.reject(self.too_large_message())
+        if not self.header_checked:
+            self.check_header(raw_data, start + len(raw_data))
+        self.hasher.update(raw_data)
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        if not self.activated:
+            return
+        # Файл короче заголовка целиком проверит ImageField формы.
+        self.parser = None
+        self.file.seek(0)
+        self.file.size = file_size
+        # Имя в хранилище — хэш содержимого (blog.storage).
+        self.file.sha256 = self.hasher.hexdigest()
+        return self.file
+
+    def check_header(self, raw_data, received):
+        try:
+            self.parser.feed(raw_data)
+        except (OSError, SyntaxError, Image.DecompressionBombError):
+            self.reject('Загрузите правильное изображение.')
+        image = self.parser.image
+        if image is None:
+            if received > header_bytes():
+                self.reject('Загрузите правильное изображение.')
+            return
+        if image.format not in ALLOWED_FORMATS:
+            self.reject(
+                f'Формат {image.format} не поддерживается: загрузите '
+                f'{", ".join(ALLOWED_FORMATS)}.'
+            )
+        width, height = image.size
+        if width * height > max_pixels():
+            self.reject(
+                f'Изображение {width}×{height} слишком большое: '
+                f'допускается не больше {max_pixels():,} пикселей.'
+            )
+        self.header_checked = True
+        self.parser = None
+
+    def too_large_message(self):
+        return (
+            f'Файл слишком большой: допускается не больше '
+            f'{max_bytes() // 1024} КБ.'
+        )
+
+    def reject(self, message):
+        if not hasattr(self.request, '_image_upload_errors'):
+            self.request._image_upload_errors = {}
+        self.request._image_upload_errors[self.field_name] = message
+        self.parser = None
+        raise SkipFile()
@@ -10,6 +10,11 @@ urlpatterns = [
         views.UserProfileDetailView.as_view(),
         name='profile'
     ),
+    path(
+        'profile/<str:username>/feed/<str:fmt>/',
+        views.author_feed,
+        name='author_feed'
+    ),
     path(
         'edit_profile/',
         views.UserEditProfileUpdateView.as_view(),
@@ -40,6 +45,11 @@ urlpatterns = [
         views.add_comment,
         name='add_comment'
     ),
+    path(
+        'posts/<int:pk>/comments/',
+        views.comments_fragment,
+        name='comments'
+    ),
     path(
         'posts/<int:post_id>/comments/<int:id>/',
         views.edit_comment,
@@ -55,5 +65,12 @@ urlpatterns = [
         views.CategoryPostsListView.as_view(),
         name='category_posts'
     ),
+    path(
+        'category/<slug:category_slug>/feed/<str:fmt>/',
+        views.category_feed,
+        name='category_feed'
+    ),
+    path('feed/<str:fmt>/', views.index_feed, name='index_feed'),
+    path('search/', views.SearchListView.as_view(), name='search'),
     path('', views.IndexListView.as_view(), name='index'),
 ]
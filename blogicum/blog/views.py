@@ -1,12 +1,21 @@
-from datetime import datetime
+import hashlib
+
 from django.contrib.auth.models import User
 from django.contrib.auth.mixins import (
     UserPassesTestMixin,
     LoginRequiredMixin
 )
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
-from django.db.models import Count
+from django.db.models import OuterRef, Subquery
+from django.http import Http404
+from django.middleware.csrf import get_token
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers
+)
+from django.utils.http import http_date, quote_etag, urlencode
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse_lazy, reverse
 from django.views.generic import (
@@ -17,9 +26,27 @@ from django.views.generic import (
     UpdateView
 )
 
-from datetime import datetime
-
+from .cache import (
+    INDEX_SCOPE,
+    FeedCacheMixin,
+    author_scope,
+    card_version,
+    category_scope,
+    templates_digest
+)
 from .forms import CommentForm, DeleteForm
+from .paginators import (
+    CachedCountMixin,
+    CachedCountPaginator,
+    CursorPaginationMixin,
+    InvalidCursor,
+    comment_page
+)
+from .feeds import Channel, feed_response
+from .routing import ReplicaReadMixin, bound_to_read_alias, replica_reads
+from .search import search_posts
+from .uploads import upload_errors
+from .visibility import visibility_horizon
 from blog.models import Post, Category, Comment
 
 
@@ -30,7 +57,21 @@ class OnlyAuthorMixin(UserPassesTestMixin):
         return object.author == self.request.user
 
 
-def filter_posts(posts):
+class ImageUploadMixin:
+    """Показывает в форме, почему загруженное фото было отброшено."""
+
+    def form_valid(self, form):
+        if upload_errors(self.request):
+            return self.form_invalid(form)
+        return super().form_valid(form)
+
+    def form_invalid(self, form):
+        for field, message in upload_errors(self.request).items():
+            form.add_error(field, message)
+        return super().form_invalid(form)
+
+
+def filter_posts(posts, horizon=None):
     return posts.select_related(
         'author',
         'location',
@@ -38,20 +79,69 @@ def filter_posts(posts):
     ).filter(
         is_published=True,
         category__is_published=True,
-        pub_date__lt=datetime.now()
+        pub_date__lt=horizon or visibility_horizon()
     ).order_by(
         '-pub_date'
-    ).annotate(comment_count=Count('comment'))
+    )
 
 
-class IndexListView(ListView):
+def get_visible_post(request, pk, posts=None):
+    """Публикация одним запросом с автором, категорией и местом.
+
+    Снятые с публикации, отложенные и публикации из скрытых категорий
+    видит только автор — по тем же правилам, что и filter_posts().
+    """
+    posts = Post.objects.all() if posts is None else posts
+    post = get_object_or_404(
+        posts.select_related('author', 'category', 'location'), pk=pk
+    )
+    if post.author_id == request.user.pk:
+        return post
+    if not (
+        post.is_published
+        and post.category is not None
+        and post.category.is_published
+        and post.pub_date < visibility_horizon()
+    ):
+        raise Http404('Публикация не найдена.')
+    return post
+
+
+class IndexListView(
+    ReplicaReadMixin,
+    FeedCacheMixin,
+    CachedCountMixin,
+    CursorPaginationMixin,
+    ListView
+):
     model = Post
-    queryset = filter_posts(Post.objects)
+    feed_cache_name = 'index'
     paginate_by = 10
     template_name = 'blog/index.html'
 
+    def get_queryset(self):
+        return filter_posts(Post.objects)
+
+
+class SearchListView(ReplicaReadMixin, ListView):
+    paginate_by = 10
+    template_name = 'blog/search.html'
+
+    def get_query(self):
+        return self.request.GET.get('q', '').strip()
+
+    def get_queryset(self):
+        return search_posts(filter_posts(Post.objects), self.get_query())
 
-class CreatePostCreateView(LoginRequiredMixin, CreateView):
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.get_query()
+        context['query'] = query
+        context['page_query'] = urlencode({'q': query}) + '&'
+        return context
+
+
+class CreatePostCreateView(LoginRequiredMixin, ImageUploadMixin, CreateView):
     model = Post
     fields = (
         'title',
@@ -75,7 +165,7 @@ class CreatePostCreateView(LoginRequiredMixin, CreateView):
         )
 
 
-class EditPostUpdateView(OnlyAuthorMixin, UpdateView):
+class EditPostUpdateView(OnlyAuthorMixin, ImageUploadMixin, UpdateView):
     model = Post
     fields = (
         'title',
@@ -91,7 +181,7 @@ class EditPostUpdateView(OnlyAuthorMixin, UpdateView):
     def get_success_url(self):
         return reverse(
             'blog:post_detail',
-            kwargs={'pk': self.kwargs['post_id']}
+            kwargs={'pk': self.kwargs['pk']}
         )
 
 
@@ -102,26 +192,123 @@ class DeletePostDeleteView(OnlyAuthorMixin, DeleteView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        post = get_object_or_404(Post, pk=self.kwargs['post_id'])
-        context['form'] = DeleteForm(instance=post)
+        context['form'] = DeleteForm(instance=self.object)
         return context
 
 
-class PostDetailDetailView(DetailView):
+def get_comment_page(request, post):
+    try:
+        return comment_page(
+            post.comment.select_related('author'),
+            getattr(settings, 'BLOG_COMMENTS_PER_PAGE', 50),
+            request.GET.get('comments_cursor'),
+        )
+    except InvalidCursor:
+        raise Http404('Неверный курсор комментариев.')
+
+
+class PostDetailDetailView(ReplicaReadMixin, DetailView):
     model = Post
     template_name = 'blog/detail.html'
+    etag_templates = (
+        'blog/detail.html',
+        'includes/comments.html',
+        'includes/header.html',
+        'includes/post_image.html',
+    )
+
+    def get_object(self, queryset=None):
+        return get_visible_post(
+            self.request, self.kwargs['pk'],
+            Post.objects.annotate(last_comment_at=Subquery(
+                Comment.objects.filter(post=OuterRef('pk')).order_by(
+                    '-created_at'
+                ).values('created_at')[:1]
+            )),
+        )
+
+    def get_validators(self):
+        """Валидаторы ETag и Last-Modified из базы, без рендера страницы.
+
+        ETag складывается из полей поста, категории и места
+        (card_version) и показанной порции комментариев вместе с их
+        текстом. Вошедшим в форме комментария выводится CSRF-токен:
+        после нового входа он другой, и старая копия страницы дала бы
+        403 при отправке, поэтому секрет тоже входит в ETag.
+        Last-Modified — создание поста или последнего
+        комментария: правку текста по нему не заметить, поэтому 304
+        отдаётся только по If-None-Match.
+        """
+        post = self.object
+        last_modified = int(max(
+            filter(None, (post.created_at, post.last_comment_at))
+        ).timestamp())
+        comments = [
+            (comment.pk, comment.text, comment.author.username)
+            for comment in self.comments
+        ]
+        csrf_secret = ''
+        if self.request.user.is_authenticated:
+            get_token(self.request)
+            csrf_secret = self.request.META['CSRF_COOKIE']
+        etag = hashlib.md5('|'.join((
+            card_version(post),
+            repr(comments),
+            templates_digest(self.etag_templates),
+            str(self.request.user.pk),
+            csrf_secret,
+            self.request.get_full_path(),
+        )).encode()).hexdigest()
+        return quote_etag(etag), last_modified
+
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        self.comments = get_comment_page(request, self.object)
+        etag, last_modified = self.get_validators()
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = self.render_to_response(
+                self.get_context_data(object=self.object)
+            )
+        response.headers['ETag'] = etag
+        response.headers['Last-Modified'] = http_date(last_modified)
+        patch_vary_headers(response, ('Cookie',))
+        patch_cache_control(
+            response, max_age=0, private=request.user.is_authenticated
+        )
+        return response
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = self.object.comment.select_related('author')
+        context['comments'] = self.comments
         return context
 
 
-class CategoryPostsListView(ListView):
+@replica_reads
+def comments_fragment(request, pk):
+    post = get_visible_post(request, pk)
+    return render(request, 'includes/comments.html', {
+        'post': post,
+        'comments': get_comment_page(request, post),
+        'fragment': True,
+    })
+
+
+class CategoryPostsListView(
+    ReplicaReadMixin,
+    FeedCacheMixin,
+    CachedCountMixin,
+    CursorPaginationMixin,
+    ListView
+):
     model = Post
     paginate_by = 10
     template_name = 'blog/category.html'
+    feed_cache_name = 'category'
+
+    def get_cache_scope(self):
+        return category_scope(self.kwargs['category_slug'])
 
     def get_queryset(self):
         return filter_posts(Post.objects).filter(
@@ -139,7 +326,7 @@ class CategoryPostsListView(ListView):
         return context
 
 
-class UserProfileDetailView(DetailView):
+class UserProfileDetailView(ReplicaReadMixin, DetailView):
     model = User
     template_name = 'blog/profile.html'
     context_object_name = 'profile'
@@ -154,8 +341,10 @@ class UserProfileDetailView(DetailView):
             author__username=self.kwargs['username']
         ).order_by(
             '-pub_date'
-        ).annotate(comment_count=Count('comment'))
-        paginator = Paginator(posts, 10)
+        )
+        paginator = CachedCountPaginator(
+            posts, 10, count_scope=author_scope(self.object.pk)
+        )
         context['page_obj'] = paginator.get_page(self.request.GET.get('page'))
         return context
 
@@ -163,6 +352,42 @@ class UserProfileDetailView(DetailView):
         return get_object_or_404(self.model, username=self.kwargs['username'])
 
 
+def _syndicated_posts():
+    return bound_to_read_alias(filter_posts(Post.objects))
+
+
+@replica_reads
+def index_feed(request, fmt):
+    return feed_response(Channel(
+        request, fmt, INDEX_SCOPE, 'Блогикум',
+        reverse('blog:index'), _syndicated_posts(),
+    ))
+
+
+@replica_reads
+def category_feed(request, category_slug, fmt):
+    category = get_object_or_404(
+        Category, slug=category_slug, is_published=True
+    )
+    return feed_response(Channel(
+        request, fmt, category_scope(category.slug),
+        f'Блогикум: {category.title}',
+        reverse('blog:category_posts', args=[category.slug]),
+        _syndicated_posts().filter(category=category),
+    ))
+
+
+@replica_reads
+def author_feed(request, username, fmt):
+    author = get_object_or_404(User, username=username)
+    return feed_response(Channel(
+        request, fmt, author_scope(author.pk),
+        f'Блогикум: {author.get_full_name() or author.username}',
+        reverse('blog:profile', args=[author.username]),
+        _syndicated_posts().filter(author=author),
+    ))
+
+
 class UserEditProfileUpdateView(UpdateView):
     model = User
     fields = ('username', 'email', 'first_name', 'last_name')
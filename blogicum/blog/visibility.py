@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+
+
+def horizon_bucket():
+    return getattr(settings, 'BLOG_VISIBILITY_BUCKET', 60)
+
+
+def visibility_horizon(now=None):
+    """Текущее время, округлённое вниз до границы корзины.
+
+    Внутри одной корзины все запросы ленты одинаковы, поэтому их
+    разделяют кэш запросов и кэш страниц. Отложенная публикация
+    появляется не позже чем через BLOG_VISIBILITY_BUCKET секунд
+    после pub_date.
+    """
+    now = now or timezone.now()
+    bucket = horizon_bucket()
+    if not bucket:
+        return now
+    seconds = now.timestamp()
+    return datetime.fromtimestamp(seconds - seconds % bucket, dt_timezone.utc)
+
+
+def visible_at(pub_date):
+    """Момент, начиная с которого публикация проходит pub_date__lt."""
+    bucket = horizon_bucket()
+    if not bucket:
+        return pub_date + timedelta(microseconds=1)
+    horizon = visibility_horizon(pub_date)
+    return horizon + timedelta(seconds=bucket)
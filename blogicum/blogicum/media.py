@@ -0,0 +1,164 @@
+"""Раздача загруженных файлов (MEDIA_ROOT).
+
+Режим задаёт MEDIA_SERVE_MODE:
+
+- 'file' — FileResponse: под gunicorn/uWSGI тело отдаётся через
+  wsgi.file_wrapper, то есть sendfile() без копирования в Python;
+- 'x-sendfile' — пустой ответ с X-Sendfile для Apache/lighttpd;
+- 'x-accel-redirect' — пустой ответ с X-Accel-Redirect для nginx,
+  файл раздаёт internal-location MEDIA_ACCEL_PREFIX;
+- 'django' — прежний django.views.static.serve.
+
+Во всех режимах кроме последнего ответ несёт ETag, Last-Modified
+и долгий Cache-Control, а 'file' сам обрабатывает Range.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote, urlsplit
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.urls import re_path
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+from django.views import static
+
+from blog.storage import BLOB_NAME
+
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+def serve_mode():
+    return getattr(settings, 'MEDIA_SERVE_MODE', 'file')
+
+
+def max_age(path):
+    # Имена фото публикаций — хэш содержимого, они не меняются никогда.
+    if BLOB_NAME.match(path):
+        return getattr(settings, 'MEDIA_IMMUTABLE_MAX_AGE', 365 * 24 * 3600)
+    return getattr(settings, 'MEDIA_MAX_AGE', 24 * 3600)
+
+
+def file_etag(stat):
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def requested_range(request, size, etag, last_modified):
+    """(start, end) из заголовка Range или None, если нужен весь файл.
+
+    Несколько диапазонов не поддерживаются: на них отдаётся весь файл,
+    как разрешает RFC 9110.
+    """
+    match = RANGE.match(request.headers.get('Range', ''))
+    if not match:
+        return None
+    if_range = request.headers.get('If-Range')
+    if if_range:
+        if if_range.startswith(('"', 'W/')):
+            fresh = if_range == etag
+        else:
+            fresh = parse_http_date_safe(if_range) == last_modified
+        if not fresh:
+            return None
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        return max(size - int(last), 0), size - 1
+    return int(first), min(int(last), size - 1) if last else size - 1
+
+
+def read_range(file, start, length):
+    with file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                return
+            length -= len(chunk)
+            yield chunk
+
+
+def serve_media(request, path):
+    mode = serve_mode()
+    if mode == 'django':
+        return static.serve(request, path, settings.MEDIA_ROOT)
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        stat = os.stat(full_path)
+    except (OSError, SuspiciousFileOperation):
+        raise Http404('Файл не найден.')
+    if not os.path.isfile(full_path) or '/.' in f'/{path}':
+        raise Http404('Файл не найден.')
+
+    etag, last_modified = file_etag(stat), int(stat.st_mtime)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        content_type, encoding = mimetypes.guess_type(full_path)
+        content_type = content_type or 'application/octet-stream'
+        if mode == 'x-sendfile':
+            response = HttpResponse(content_type=content_type)
+            response['X-Sendfile'] = full_path
+        elif mode == 'x-accel-redirect':
+            response = HttpResponse(content_type=content_type)
+            response['X-Accel-Redirect'] = quote(
+                getattr(settings, 'MEDIA_ACCEL_PREFIX', '/protected-media/')
+                + path
+            )
+        else:
+            response = file_response(
+                request, full_path, stat.st_size, content_type,
+                etag, last_modified
+            )
+        if encoding:
+            response['Content-Encoding'] = encoding
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, public=True, max_age=max_age(path))
+    if BLOB_NAME.match(path):
+        patch_cache_control(response, immutable=True)
+    return response
+
+
+def file_response(request, full_path, size, content_type, etag,
+                  last_modified):
+    byte_range = requested_range(request, size, etag, last_modified)
+    if byte_range is None:
+        response = FileResponse(
+            open(full_path, 'rb'), content_type=content_type
+        )
+    elif byte_range[0] >= size or byte_range[0] > byte_range[1]:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+    else:
+        start, end = byte_range
+        # Кусок файла отдаётся генератором: без file_wrapper, но и без
+        # чтения остатка файла.
+        response = FileResponse(
+            read_range(open(full_path, 'rb'), start, end - start + 1),
+            content_type=content_type, status=206,
+        )
+        response['Content-Length'] = end - start + 1
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def media_urlpatterns():
+    """Замена static(MEDIA_URL) — работает и при DEBUG = False."""
+    prefix = settings.MEDIA_URL
+    if not prefix or urlsplit(prefix).netloc:
+        return []
+    return [
+        re_path(
+            r'^%s(?P<path>.*)$' % re.escape(prefix.lstrip('/')),
+            serve_media,
+            name='media',
+        ),
+    ]
@@ -42,27 +42,35 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
-    'debug_toolbar',
 ]
 
 MIDDLEWARE = [
+    'pages.instrumentation.RequestTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'blog.routing.ReadYourWritesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
 
+# debug_toolbar только для разработки: под нагрузкой он лишь мешает,
+# а число запросов и тайминги в продакшене отдаёт Server-Timing.
+if DEBUG:
+    INSTALLED_APPS.append('debug_toolbar')
+    MIDDLEWARE.append('debug_toolbar.middleware.DebugToolbarMiddleware')
+
 ROOT_URLCONF = 'blogicum.urls'
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates с учётом времени рендера для Server-Timing.
+        'BACKEND': 'pages.instrumentation.TimedDjangoTemplates',
+        'NAME': 'django',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -89,6 +97,10 @@ DATABASES = {
     }
 }
 
+# Чтение ленты, категорий, постов и профилей с реплик BLOG_READ_REPLICAS,
+# запись — в default (blog/routing.py).
+DATABASE_ROUTERS = ['blog.routing.ReplicaRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -148,6 +160,92 @@ CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
 
 MEDIA_ROOT = BASE_DIR / 'media'
 
+MEDIA_URL = '/media/'
+
+# Как отдавать MEDIA_ROOT (blogicum/media.py): 'file' — FileResponse
+# с sendfile() через wsgi.file_wrapper, 'x-accel-redirect' (nginx),
+# 'x-sendfile' (Apache, lighttpd) или 'django' — views.static.serve.
+MEDIA_SERVE_MODE = 'file'
+# internal-location nginx, который смотрит в MEDIA_ROOT.
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+
+# Фото публикаций пишутся на диск по мере загрузки и проверяются
+# по заголовку (blog.uploads); остальные файлы — стандартными обработчиками.
+FILE_UPLOAD_HANDLERS = [
+    'blog.uploads.ImageUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
+
+# Keyset-пагинация ленты по (pub_date, id) для всех запросов;
+# без неё режим включается параметром ?cursor=.
+BLOG_CURSOR_PAGINATION = False
+
+# Время жизни кэша страниц ленты и категорий для анонимных посетителей,
+# в секундах; 0 — кэш выключен.
+BLOG_FEED_CACHE_TIMEOUT = 0
+
+# Адрес сайта, страницы которого publish_scheduled прогревает после
+# публикации; пустая строка — только сброс кэша.
+BLOG_WARMUP_BASE_URL = ''
+
+# Шаг округления горизонта видимости filter_posts(), в секундах.
+# Отложенные публикации появляются в ленте с задержкой не больше шага;
+# 0 — точное текущее время в каждом запросе.
+BLOG_VISIBILITY_BUCKET = 60
+
+# Кэш отрисованных карточек публикаций (includes/post_card.html):
+# время жизни в общем кэше в секундах (0 — выключен) и размер LRU
+# внутри процесса.
+BLOG_POST_CARD_CACHE_TIMEOUT = 300
+BLOG_POST_CARD_LRU_SIZE = 512
+
+# Общее число публикаций для пагинатора: выборки до порога считаются
+# точно (COUNT по LIMIT), большие берутся из кэша и пересчитываются
+# в фоне. Время жизни в секундах; 0 — всегда точный COUNT(*).
+BLOG_COUNT_CACHE_TIMEOUT = 300
+BLOG_COUNT_EXACT_THRESHOLD = 1000
+
+# Сколько комментариев показывать на странице поста за раз.
+BLOG_COMMENTS_PER_PAGE = 50
+
+# Ширины уменьшенных копий фото публикаций (WebP и JPEG для srcset).
+# Копии строятся фоновым потоком после сохранения поста; False — сразу
+# в том же процессе.
+BLOG_IMAGE_RENDITION_WIDTHS = (320, 640, 1280)
+BLOG_IMAGE_RENDITIONS_ASYNC = True
+
+# Ограничения для загружаемых фото: размер файла в байтах, число
+# пикселей по заголовку и сколько байт читать в поисках заголовка.
+BLOG_IMAGE_MAX_BYTES = 10 * 1024 * 1024
+BLOG_IMAGE_MAX_PIXELS = 40_000_000
+BLOG_IMAGE_HEADER_BYTES = 256 * 1024
+
+# Алиасы DATABASES с репликами для чтения ленты; пусто — всё в default.
+# После записи браузер читает из default ещё столько секунд.
+BLOG_READ_REPLICAS = []
+BLOG_REPLICA_PIN_SECONDS = 10
+
+# Ленты RSS/Atom/JSON (blog/feeds.py): число публикаций и время жизни
+# готового ответа в кэше (и Cache-Control: max-age), в секундах.
+BLOG_SYNDICATION_ITEMS = 20
+BLOG_SYNDICATION_CACHE_TIMEOUT = 300
+
+# Server-Timing и кольцевой буфер замеров по имени URL
+# (pages/instrumentation.py); размер буфера — на одно имя.
+REQUEST_TIMING = True
+REQUEST_TIMING_BUFFER = 256
+
+# Метрики Prometheus на /pages/metrics/ (pages/metrics.py): файлы
+# воркеров в METRICS_DIR (None — метрики не собираются). Без входа
+# под staff метрики отдаются адресам из METRICS_ALLOWED_IPS и по
+# заголовку Authorization: Bearer <METRICS_TOKEN>; за прокси
+# REMOTE_ADDR у всех запросов один, поэтому там нужен токен.
+METRICS_ENABLED = True
+METRICS_DIR = None
+METRICS_ALLOWED_IPS = []
+METRICS_TOKEN = ''
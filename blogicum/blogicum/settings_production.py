@@ -0,0 +1,74 @@
+"""Настройки для продакшена поверх blogicum.settings.
+
+Пример: DJANGO_SETTINGS_MODULE=blogicum.settings_production gunicorn ...
+"""
+import os
+from copy import deepcopy
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR
+from .settings import DATABASES as BASE_DATABASES
+from .settings import INSTALLED_APPS as BASE_INSTALLED_APPS
+from .settings import MIDDLEWARE as BASE_MIDDLEWARE
+from .settings import TEMPLATES as BASE_TEMPLATES
+
+DEBUG = False
+
+# blogicum.settings добавил debug_toolbar при DEBUG = True — убираем.
+INSTALLED_APPS = [
+    app for app in BASE_INSTALLED_APPS if not app.startswith('debug_toolbar')
+]
+MIDDLEWARE = [
+    name for name in BASE_MIDDLEWARE if not name.startswith('debug_toolbar')
+]
+
+# Явный cached.Loader: шаблоны читаются и разбираются один раз на воркер.
+TEMPLATES = deepcopy(BASE_TEMPLATES)
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+
+# SQLite в режиме WAL с PRAGMA из blogicum/sqlite/base.py; соединение
+# живёт между запросами воркера и проверяется перед повторным использованием.
+DATABASES = deepcopy(BASE_DATABASES)
+DATABASES['default'].update({
+    'ENGINE': 'blogicum.sqlite',
+    'CONN_MAX_AGE': 600,
+    'CONN_HEALTH_CHECKS': True,
+})
+
+# Компиляция всех шаблонов проекта при старте воркера (blogicum/warmup.py).
+TEMPLATE_WARMUP = True
+
+# Общий для всех воркеров и команд кэш: сигналы одного процесса
+# сбрасывают поколения ленты для всех. С LocMemCache у каждого воркера
+# своя копия, и кэш ленты выключать (проверка blog.W001).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+BLOG_FEED_CACHE_TIMEOUT = 60
+BLOG_WARMUP_BASE_URL = 'http://127.0.0.1:8000'
+
+# Файлы метрик воркеров; токен для Prometheus задаётся в окружении.
+METRICS_DIR = BASE_DIR / 'metrics'
+METRICS_TOKEN = os.environ.get('BLOGICUM_METRICS_TOKEN', '')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'blogicum.warmup': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
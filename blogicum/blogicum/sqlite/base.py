@@ -0,0 +1,47 @@
+"""SQLite с настройкой PRAGMA при каждом подключении.
+
+Включается в DATABASES:
+
+    'ENGINE': 'blogicum.sqlite',
+    'OPTIONS': {'pragmas': {'mmap_size': 0}},  # поверх DEFAULT_PRAGMAS
+
+WAL позволяет читать ленту, пока другой процесс пишет комментарий:
+читатели не ждут писателя, а писатели ждут друг друга до busy_timeout
+вместо мгновенной ошибки «database is locked».
+"""
+import re
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    # В режиме WAL NORMAL не теряет целостность, только последние
+    # транзакции при отключении питания; fsync — на checkpoint.
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    # Отрицательное значение — в КиБ: 64 МиБ страничного кэша.
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+}
+PRAGMA_VALUE = re.compile(r'^-?\w+$')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.pragmas = {**DEFAULT_PRAGMAS, **params.pop('pragmas', {})}
+        for name, value in self.pragmas.items():
+            if not (name.isidentifier() and PRAGMA_VALUE.match(str(value))):
+                raise ImproperlyConfigured(
+                    f'Недопустимая PRAGMA {name} = {value!r}.'
+                )
+        return params
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            connection.execute(f'PRAGMA {name} = {value}')
+        return connection
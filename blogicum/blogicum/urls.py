@@ -3,7 +3,8 @@ from django.contrib.auth.forms import UserCreationForm
 from django.views.generic.edit import CreateView
 from django.urls import path, include, reverse_lazy
 from django.conf import settings
-from django.conf.urls.static import static
+
+from .media import media_urlpatterns
 
 urlpatterns = [
     path('auth/', include('django.contrib.auth.urls')),
@@ -19,7 +20,7 @@ urlpatterns = [
     path('pages/', include('pages.urls', namespace='pages')),
     path('admin/', admin.site.urls),
     path('', include('blog.urls', namespace='blog')),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+] + media_urlpatterns()
 handler404 = 'pages.views.page_not_found'
 handler500 = 'pages.views.server_error'
 
@@ -0,0 +1,69 @@
+"""Компиляция шаблонов проекта до первого запроса."""
+import logging
+import time
+from pathlib import Path
+from typing import List, NamedTuple
+
+from django.apps import apps
+from django.conf import settings
+from django.template import TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_SUFFIXES = ('.html', '.txt')
+
+
+class WarmupReport(NamedTuple):
+    compiled: int
+    failed: List[str]
+    seconds: float
+
+
+def template_dirs(engine):
+    """Каталоги DIRS движка и templates/ приложений самого проекта."""
+    dirs = [Path(directory) for directory in engine.engine.dirs]
+    if engine.engine.app_dirs or any(
+        'app_directories' in str(loader) for loader in engine.engine.loaders
+    ):
+        base_dir = Path(settings.BASE_DIR).resolve()
+        dirs.extend(
+            Path(config.path) / 'templates'
+            for config in apps.get_app_configs()
+            if base_dir in Path(config.path).resolve().parents
+        )
+    return [directory for directory in dirs if directory.is_dir()]
+
+
+def warm_templates():
+    """Загружает все шаблоны проекта, наполняя cached.Loader."""
+    started = time.perf_counter()
+    compiled, failed = 0, []
+    for engine in engines.all():
+        if not isinstance(engine, DjangoTemplates):
+            continue
+        for directory in template_dirs(engine):
+            for path in sorted(directory.rglob('*')):
+                if path.suffix not in TEMPLATE_SUFFIXES:
+                    continue
+                name = path.relative_to(directory).as_posix()
+                try:
+                    engine.get_template(name)
+                except TemplateSyntaxError as error:
+                    failed.append(f'{name}: {error}')
+                else:
+                    compiled += 1
+    report = WarmupReport(compiled, failed, time.perf_counter() - started)
+    logger.info(
+        'Скомпилировано шаблонов: %d за %.1f мс, с ошибками: %d',
+        report.compiled, report.seconds * 1000, len(report.failed),
+    )
+    for failure in report.failed:
+        logger.error('Шаблон не скомпилирован: %s', failure)
+    return report
+
+
+def warm_up():
+    """Хук запуска воркера: wsgi.py и asgi.py зовут его при загрузке."""
+    if getattr(settings, 'TEMPLATE_WARMUP', False):
+        warm_templates()
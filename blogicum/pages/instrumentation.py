@@ -0,0 +1,175 @@
+"""Замеры запроса: число и время SQL, время рендера шаблонов и общее.
+
+RequestTimingMiddleware отдаёт их в заголовке Server-Timing (видно
+во вкладке Network браузера) и складывает в кольцевой буфер по имени
+URL (blog:index, blog:post_detail, …), который показывает
+pages:timings, а также в общие для воркеров метрики pages/metrics.py.
+Накладные расходы — пара perf_counter() на SQL-запрос и на шаблон,
+так что middleware можно не выключать в продакшене.
+"""
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template
+
+from . import metrics
+
+UNRESOLVED = '<unresolved>'
+
+_current = ContextVar('request_timing', default=None)
+_buffers = {}
+_buffers_lock = threading.Lock()
+
+
+def timing_enabled():
+    return getattr(settings, 'REQUEST_TIMING', True)
+
+
+def buffer_size():
+    return getattr(settings, 'REQUEST_TIMING_BUFFER', 256)
+
+
+class RequestTiming:
+    __slots__ = (
+        'started', 'total', 'sql_count', 'sql_time', 'template_time',
+        'template_depth',
+    )
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.total = 0.0
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper: засекаем каждый SQL-запрос.
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - started
+            self.sql_count += 1
+
+    def server_timing(self):
+        return (
+            f'sql;dur={self.sql_time * 1000:.1f};'
+            f'desc="{self.sql_count} SQL", '
+            f'tpl;dur={self.template_time * 1000:.1f}, '
+            f'total;dur={self.total * 1000:.1f}'
+        )
+
+
+@contextmanager
+def timed_render():
+    timing = _current.get()
+    if timing is None:
+        yield
+        return
+    # Вложенные render_to_string (карточки постов) уже внутри внешнего.
+    timing.template_depth += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.template_depth -= 1
+        if not timing.template_depth:
+            timing.template_time += time.perf_counter() - started
+
+
+class TimedTemplate(Template):
+
+    def render(self, context=None, request=None):
+        with timed_render():
+            return super().render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates, чьи шаблоны учитывают время рендера."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(
+            super().from_string(template_code).template, self
+        )
+
+    def get_template(self, template_name):
+        return TimedTemplate(
+            super().get_template(template_name).template, self
+        )
+
+
+def record(url_name, timing, status):
+    buffer = _buffers.get(url_name)
+    if buffer is None:
+        with _buffers_lock:
+            buffer = _buffers.setdefault(
+                url_name, deque(maxlen=buffer_size())
+            )
+    buffer.append((
+        timing.total, timing.sql_count, timing.sql_time,
+        timing.template_time, status,
+    ))
+
+
+def timing_summary():
+    """Сводка по последним запросам каждого имени URL в этом процессе."""
+    summary = {}
+    for url_name, buffer in list(_buffers.items()):
+        samples = list(buffer)
+        if not samples:
+            continue
+        totals = sorted(sample[0] for sample in samples)
+        queries = [sample[1] for sample in samples]
+        summary[url_name] = {
+            'requests': len(samples),
+            'total_ms_avg': sum(totals) / len(totals) * 1000,
+            'total_ms_p95': totals[
+                min(len(totals) - 1, int(len(totals) * 0.95))
+            ] * 1000,
+            'sql_count_avg': sum(queries) / len(queries),
+            'sql_count_max': max(queries),
+            'sql_ms_avg': sum(s[2] for s in samples) / len(samples) * 1000,
+            'template_ms_avg': (
+                sum(s[3] for s in samples) / len(samples) * 1000
+            ),
+            'errors': sum(1 for s in samples if s[4] >= 500),
+        }
+    return summary
+
+
+def reset_timings():
+    with _buffers_lock:
+        _buffers.clear()
+
+
+class RequestTimingMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not timing_enabled():
+            return self.get_response(request)
+        timing = RequestTiming()
+        token = _current.set(timing)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timing))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        timing.total = time.perf_counter() - timing.started
+        match = request.resolver_match
+        view_name = match.view_name if match else UNRESOLVED
+        record(view_name, timing, response.status_code)
+        if metrics.metrics_enabled():
+            metrics.observe(view_name, timing, response)
+        response['Server-Timing'] = timing.server_timing()
+        return response
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blogicum.warmup import warm_templates
+
+
+class Command(BaseCommand):
+    help = 'Компилирует все шаблоны проекта и печатает отчёт о времени.'
+
+    def handle(self, *args, **options):
+        report = warm_templates()
+        self.stdout.write(
+            f'Скомпилировано шаблонов: {report.compiled} '
+            f'за {report.seconds * 1000:.1f} мс'
+        )
+        if report.failed:
+            raise CommandError(
+                'Шаблоны с ошибками:\n' + '\n'.join(report.failed)
+            )
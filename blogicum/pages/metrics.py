@@ -0,0 +1,311 @@
+"""Метрики в текстовом формате Prometheus: /pages/metrics/.
+
+Каждый поток каждого воркера пишет в свой файл в METRICS_DIR
+(без каталога метрики не собираются),
+отображённый в память (mmap): у файла один писатель, поэтому запись
+обходится без блокировок. Экспорт складывает значения всех файлов
+каталога — так метрики сходятся по всем воркерам gunicorn, а сбор
+не трогает базу. Счётчики накопительные и переживают перезапуск
+воркеров; при выкладке каталог стоит очищать.
+
+Формат файла: 8 байт — занятая длина, затем записи «длина ключа
+(4 байта), ключ в UTF-8 с выравниванием до 8 байт, значение double».
+Длина обновляется последней, так что читатель видит только записи
+целиком.
+"""
+import json
+import mmap
+import os
+import struct
+import threading
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+FILE_SUFFIX = '.metrics'
+INITIAL_SIZE = 64 * 1024
+
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+# Имя -> (тип, описание, границы корзин гистограммы).
+METRICS = {
+    'blogicum_http_requests_total': (
+        'counter', 'Запросы по имени URL и коду ответа.', None,
+    ),
+    'blogicum_http_request_duration_seconds': (
+        'histogram', 'Время ответа по имени URL.', DURATION_BUCKETS,
+    ),
+    'blogicum_db_queries_per_request': (
+        'histogram', 'SQL-запросов на один ответ.', QUERY_BUCKETS,
+    ),
+    'blogicum_db_query_duration_seconds_total': (
+        'counter', 'Суммарное время SQL-запросов.', None,
+    ),
+    'blogicum_feed_cache_requests_total': (
+        'counter', 'Обращения к кэшу страниц ленты (X-Feed-Cache).', None,
+    ),
+}
+
+_HEADER = struct.Struct('<Q')
+_LENGTH = struct.Struct('<I')
+_VALUE = struct.Struct('<d')
+
+_local = threading.local()
+
+
+def metrics_dir():
+    directory = getattr(settings, 'METRICS_DIR', None)
+    return None if directory is None else Path(directory)
+
+
+def metrics_enabled():
+    return getattr(settings, 'METRICS_ENABLED', True) and (
+        metrics_dir() is not None
+    )
+
+
+def allowed_ips():
+    return getattr(settings, 'METRICS_ALLOWED_IPS', [])
+
+
+def scrape_token():
+    return getattr(settings, 'METRICS_TOKEN', '')
+
+
+def _entries(buffer, used):
+    """(ключ, смещение значения) для каждой записи буфера."""
+    position = _HEADER.size
+    while position + _LENGTH.size <= used:
+        length = _LENGTH.unpack_from(buffer, position)[0]
+        key_start = position + _LENGTH.size
+        value_at = key_start + length + (-(_LENGTH.size + length) % 8)
+        if value_at + _VALUE.size > used:
+            break
+        yield bytes(buffer[key_start:key_start + length]), value_at
+        position = value_at + _VALUE.size
+
+
+class MetricsFile:
+    """Файл метрик одного потока; писать в него может только он."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.pid = os.getpid()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        size = os.fstat(self._fd).st_size
+        if size < INITIAL_SIZE:
+            os.ftruncate(self._fd, INITIAL_SIZE)
+            size = INITIAL_SIZE
+        self._map = mmap.mmap(self._fd, size)
+        self._used = _HEADER.unpack_from(self._map, 0)[0]
+        if not self._used:
+            self._used = _HEADER.size
+            _HEADER.pack_into(self._map, 0, self._used)
+        # Поток с переиспользованным ident продолжает старый файл.
+        self._positions = dict(_entries(self._map, self._used))
+
+    def add(self, key, amount):
+        position = self._positions.get(key)
+        if position is None:
+            position = self._append(key)
+        value = _VALUE.unpack_from(self._map, position)[0]
+        _VALUE.pack_into(self._map, position, value + amount)
+
+    def _append(self, key):
+        padding = -(_LENGTH.size + len(key)) % 8
+        size = _LENGTH.size + len(key) + padding + _VALUE.size
+        if self._used + size > len(self._map):
+            self._grow(self._used + size)
+        position = self._used
+        _LENGTH.pack_into(self._map, position, len(key))
+        key_start = position + _LENGTH.size
+        self._map[key_start:key_start + len(key)] = key
+        value_at = key_start + len(key) + padding
+        _VALUE.pack_into(self._map, value_at, 0.0)
+        self._used += size
+        _HEADER.pack_into(self._map, 0, self._used)
+        self._positions[key] = value_at
+        return value_at
+
+    def _grow(self, needed):
+        size = len(self._map)
+        while size < needed:
+            size *= 2
+        self._map.close()
+        os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+
+    def close(self):
+        self._map.close()
+        os.close(self._fd)
+
+
+def read_file(path):
+    """Значения из файла метрик; недописанный хвост пропускается."""
+    data = Path(path).read_bytes()
+    if len(data) < _HEADER.size:
+        return {}
+    used = min(_HEADER.unpack_from(data, 0)[0], len(data))
+    return {
+        key: _VALUE.unpack_from(data, position)[0]
+        for key, position in _entries(data, used)
+    }
+
+
+def _writer():
+    directory = metrics_dir()
+    writer = getattr(_local, 'writer', None)
+    # После fork() поток-наследник не должен писать в файл родителя.
+    if (
+        writer is None
+        or writer.pid != os.getpid()
+        or writer.path.parent != directory
+    ):
+        writer = MetricsFile(
+            directory / f'{os.getpid()}-{threading.get_ident()}{FILE_SUFFIX}'
+        )
+        _local.writer = writer
+    return writer
+
+
+def _key(name, **labels):
+    return json.dumps(
+        [name, labels], sort_keys=True, ensure_ascii=False
+    ).encode()
+
+
+def _bucket(buckets, value):
+    for bound in buckets:
+        if value <= bound:
+            return repr(float(bound))
+    return '+Inf'
+
+
+def _observe_histogram(writer, name, value, **labels):
+    buckets = METRICS[name][2]
+    writer.add(
+        _key(f'{name}_bucket', le=_bucket(buckets, value), **labels), 1
+    )
+    writer.add(_key(f'{name}_sum', **labels), value)
+    writer.add(_key(f'{name}_count', **labels), 1)
+
+
+def observe(view, timing, response):
+    """Учитывает завершённый запрос; timing — из RequestTimingMiddleware."""
+    writer = _writer()
+    writer.add(_key(
+        'blogicum_http_requests_total',
+        view=view, status=str(response.status_code),
+    ), 1)
+    _observe_histogram(
+        writer, 'blogicum_http_request_duration_seconds', timing.total,
+        view=view,
+    )
+    _observe_histogram(
+        writer, 'blogicum_db_queries_per_request', timing.sql_count,
+        view=view,
+    )
+    writer.add(_key(
+        'blogicum_db_query_duration_seconds_total', view=view,
+    ), timing.sql_time)
+    feed_cache = response.get('X-Feed-Cache')
+    if feed_cache:
+        writer.add(_key(
+            'blogicum_feed_cache_requests_total',
+            view=view, result=feed_cache.lower(),
+        ), 1)
+
+
+def collect():
+    """Сумма значений по файлам всех воркеров: {(имя, метки): значение}."""
+    totals = defaultdict(float)
+    directory = metrics_dir()
+    if directory is None or not directory.is_dir():
+        return totals
+    for path in directory.glob(f'*{FILE_SUFFIX}'):
+        try:
+            values = read_file(path)
+        except FileNotFoundError:
+            continue
+        for key, value in values.items():
+            name, labels = json.loads(key)
+            totals[name, tuple(sorted(labels.items()))] += value
+    return totals
+
+
+def _escape(value):
+    return (
+        value.replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+    )
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(
+        f'{name}="{_escape(value)}"' for name, value in labels
+    ) + '}'
+
+
+def _format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+def _histogram_lines(name, buckets, totals):
+    series = defaultdict(dict)
+    for (sample, labels), value in totals.items():
+        if sample == f'{name}_bucket':
+            labels = dict(labels)
+            series[tuple(sorted(
+                (k, v) for k, v in labels.items() if k != 'le'
+            ))][labels['le']] = value
+    for labels in sorted(series):
+        counts, cumulative = series[labels], 0.0
+        for bound in (*map(float, buckets), '+Inf'):
+            le = bound if bound == '+Inf' else repr(bound)
+            cumulative += counts.get(le, 0.0)
+            yield (
+                f'{name}_bucket{_format_labels((*labels, ("le", le)))} '
+                f'{_format_value(cumulative)}'
+            )
+        for suffix in ('_sum', '_count'):
+            yield (
+                f'{name}{suffix}{_format_labels(labels)} '
+                f'{_format_value(totals.get((name + suffix, labels), 0))}'
+            )
+
+
+def render_metrics():
+    totals = collect()
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        if kind == 'histogram':
+            lines.extend(_histogram_lines(name, buckets, totals))
+            continue
+        lines.extend(
+            f'{name}{_format_labels(labels)} {_format_value(value)}'
+            for (sample, labels), value in sorted(totals.items())
+            if sample == name
+        )
+    return '\n'.join(lines) + '\n'
+
+
+def clear_metrics():
+    """Удаляет файлы метрик (при выкладке и в тестах)."""
+    writer = getattr(_local, 'writer', None)
+    if writer is not None:
+        writer.close()
+        _local.writer = None
+    directory = metrics_dir()
+    if directory is None:
+        return
+    for path in directory.glob(f'*{FILE_SUFFIX}'):
+        path.unlink(missing_ok=True)
@@ -7,4 +7,6 @@ app_name = 'pages'
 urlpatterns = [
     path('about/', views.About.as_view(), name='about'),
     path('rules/', views.Rules.as_view(), name='rules'),
+    path('timings/', views.Timings.as_view(), name='timings'),
+    path('metrics/', views.Metrics.as_view(), name='metrics'),
 ]
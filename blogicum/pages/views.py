@@ -1,5 +1,14 @@
+from hmac import compare_digest
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render
-from django.views.generic import TemplateView
+from django.utils.decorators import method_decorator
+from django.views.generic import TemplateView, View
+
+from . import metrics
+from .instrumentation import timing_summary
 
 
 class About(TemplateView):
@@ -20,3 +29,37 @@ def csrf_failure(request, reason=''):
 
 def server_error(request, reason=''):
     return render(request, 'pages/500.html', status=500)
+
+
+@method_decorator(staff_member_required, name='dispatch')
+class Timings(View):
+    """Сводка RequestTimingMiddleware по последним запросам воркера."""
+
+    def get(self, request):
+        return JsonResponse(
+            timing_summary(), json_dumps_params={'indent': 2}
+        )
+
+
+class Metrics(View):
+    """Метрики всех воркеров для Prometheus; база не используется."""
+
+    def get(self, request):
+        if not self.allowed(request):
+            raise PermissionDenied
+        return HttpResponse(
+            metrics.render_metrics(), content_type=metrics.CONTENT_TYPE
+        )
+
+    def allowed(self, request):
+        # Адрес и токен проверяются первыми: сборщику не нужна сессия.
+        # За nginx REMOTE_ADDR всегда адрес прокси — там нужен токен.
+        token = metrics.scrape_token()
+        return (
+            request.META.get('REMOTE_ADDR') in metrics.allowed_ips()
+            or bool(token) and compare_digest(
+                request.headers.get('Authorization', '').encode(),
+                f'Bearer {token}'.encode(),
+            )
+            or request.user.is_staff
+        )
@@ -41,6 +41,13 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def disable_metrics():
+    # Метрики включает только test_metrics.py со своим каталогом.
+    with override_settings(METRICS_ENABLED=False):
+        yield
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -93,6 +100,8 @@ pytest_plugins = [
     "fixtures.categories",
     "fixtures.comments",
     "adapters.comment",
+    "fixtures.query_budget",
+    "fixtures.images",
 ]
 
 
@@ -0,0 +1,30 @@
+"""Временный MEDIA_ROOT и фото для тестов загрузок и хранения.
+
+Фикстура ``media_root`` подключается в модуле через
+``pytest.mark.usefixtures("media_root")``; ``make_image`` — обычная
+функция, чтобы фото можно было создавать и в ``parametrize``.
+"""
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+
+def make_image(width=40, height=30, fmt="PNG", name="photo.png",
+               color=(0, 0, 0), exif=None):
+    """Картинка в виде загруженного через форму файла."""
+    buffer = BytesIO()
+    options = {} if exif is None else {"exif": exif}
+    Image.new("RGB", (width, height), color).save(buffer, fmt, **options)
+    return SimpleUploadedFile(
+        name, buffer.getvalue(),
+        content_type=Image.MIME.get(fmt, "application/octet-stream"),
+    )
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.BLOG_IMAGE_RENDITIONS_ASYNC = False
+    return tmp_path
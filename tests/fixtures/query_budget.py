@@ -0,0 +1,145 @@
+"""Бюджеты SQL-запросов и размера ответа для страниц блога.
+
+Плагин подключается в conftest.py и даёт:
+
+* фикстуру ``budget_scale`` — число публикаций в базе; тест, который
+  её запрашивает, прогоняется для каждого масштаба из
+  ``--query-budget-scales`` (по умолчанию 10, 1 000 и 100 000);
+* фикстуру ``blog_at_scale`` — блог такого размера, созданный через
+  bulk_create: автор с частью публикаций, категории, места и «горячая»
+  публикация с комментариями;
+* фикстуру ``query_budget`` — запрос к адресу с подсчётом SQL и байт
+  ответа и проверкой бюджета.
+
+Кэши перед каждым замером очищаются: бюджет считается для холодного
+запроса, иначе N+1 прятался бы за кэшем карточек.
+"""
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+DEFAULT_SCALES = '10,1000,100000'
+BATCH_SIZE = 2000
+HOT_COMMENTS = 120
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--query-budget-scales',
+        default=DEFAULT_SCALES,
+        help='Число публикаций для проверки бюджетов через запятую '
+             f'(по умолчанию {DEFAULT_SCALES}).',
+    )
+
+
+def pytest_generate_tests(metafunc):
+    if 'budget_scale' in metafunc.fixturenames:
+        scales = metafunc.config.getoption('--query-budget-scales')
+        metafunc.parametrize(
+            'budget_scale',
+            [int(scale) for scale in scales.split(',') if scale.strip()],
+            ids=lambda scale: f'{scale}posts',
+        )
+
+
+def seed_blog(n_posts):
+    from blog.models import Category, Comment, Location, Post
+    from blog.search import rebuild_search_index
+
+    User = get_user_model()
+    author, *readers = User.objects.bulk_create(
+        User(username=f'budget{i}') for i in range(20)
+    )
+    categories = Category.objects.bulk_create(
+        Category(
+            title=f'Категория {i}', description='Описание',
+            slug=f'budget-{i}', is_published=i != 0,
+        )
+        for i in range(5)
+    )
+    locations = Location.objects.bulk_create(
+        Location(name=f'Место {i}') for i in range(3)
+    )
+    now = timezone.now()
+    Post.objects.bulk_create(
+        (
+            Post(
+                title=f'Пост номер {i}',
+                text='Текст публикации для проверки бюджета. ' * 10,
+                pub_date=now - timedelta(minutes=10 * i + 10),
+                # Каждая четвёртая публикация — у одного автора.
+                author=author if i % 4 == 0 else readers[i % len(readers)],
+                category=categories[i % len(categories)],
+                location=locations[i % len(locations)] if i % 2 else None,
+                is_published=i % 10 != 9,
+            )
+            for i in range(n_posts)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    hot = Post.objects.filter(
+        author=author, is_published=True, category__is_published=True
+    ).select_related('category').order_by('-pub_date').first()
+    comments = Comment.objects.bulk_create(
+        Comment(
+            text=f'Комментарий {i}', post=hot,
+            author=readers[i % len(readers)],
+        )
+        for i in range(HOT_COMMENTS)
+    )
+    Post.objects.filter(pk=hot.pk).update(comment_count=HOT_COMMENTS)
+    hot.refresh_from_db()
+    rebuild_search_index()
+    return SimpleNamespace(
+        author=author, reader=readers[0], category=hot.category,
+        post=hot, comment=comments[0], n_posts=n_posts,
+    )
+
+
+@pytest.fixture
+def blog_at_scale(budget_scale, db):
+    return seed_blog(budget_scale)
+
+
+def _content(response):
+    if response.streaming:
+        return b''.join(response.streaming_content)
+    return response.content
+
+
+@pytest.fixture
+def query_budget():
+    """Проверяет число SQL-запросов и байт ответа одной страницы."""
+    from blog.cache import card_lru
+
+    def check(client, url, max_queries, max_bytes, method='get', data=None):
+        cache.clear()
+        card_lru.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(client, method)(url, data)
+            # Потоковые ответы читают базу, пока отдают тело.
+            content = _content(response)
+        assert response.status_code < 400, (
+            f'Страница {url} вернула код {response.status_code}.'
+        )
+        executed = '\n'.join(
+            f'  {query["sql"]}' for query in queries.captured_queries
+        )
+        assert len(queries) <= max_queries, (
+            f'Страница {url} выполнила {len(queries)} SQL-запросов при '
+            f'бюджете {max_queries}. Проверьте, нет ли N+1 в шаблонах:\n'
+            f'{executed}'
+        )
+        assert len(content) <= max_bytes, (
+            f'Ответ {url} занял {len(content)} байт при бюджете '
+            f'{max_bytes}.'
+        )
+        return len(queries), len(content)
+
+    return check
@@ -0,0 +1,74 @@
+import pytest
+from django.core.management import CommandError, call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_comments(
+        user_client, user, another_user, post_with_published_location, mixer):
+    post = post_with_published_location
+    user_client.post(f"/posts/{post.id}/comment/", {"text": "Первый"})
+    user_client.post(f"/posts/{post.id}/comment/", {"text": "Второй"})
+    mixer.blend("blog.Comment", post=post, author=another_user)
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        "Убедитесь, что добавление комментария увеличивает "
+        "`Post.comment_count`."
+    )
+
+    comment = post.comment.filter(author=user).first()
+    user_client.post(
+        f"/posts/{post.id}/comments/{comment.id}/delete_comment/"
+    )
+    post.refresh_from_db()
+    assert post.comment_count == 2
+
+    another_user.delete()
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        "Убедитесь, что каскадное удаление комментариев уменьшает "
+        "`Post.comment_count`."
+    )
+
+
+def test_check_and_rebuild_comment_counts(
+        post_with_published_location, mixer, PostModel):
+    mixer.blend("blog.Comment", post=post_with_published_location)
+    PostModel.objects.update(comment_count=42)
+    with pytest.raises(CommandError):
+        call_command("check_comment_counts")
+
+    call_command("rebuild_comment_counts")
+    call_command("check_comment_counts")
+    post_with_published_location.refresh_from_db()
+    assert post_with_published_location.comment_count == 1
+
+
+def test_cascade_delete_does_not_touch_each_comment(
+        user, another_user, post_with_published_location, mixer,
+        django_assert_max_num_queries):
+    from blog.comment_counts import rebuild_comment_counts
+    from blog.models import Comment
+
+    post = post_with_published_location
+    other_post = mixer.blend(
+        "blog.Post", author=user, category=post.category,
+        is_published=True,
+    )
+    for target in (post, other_post):
+        Comment.objects.bulk_create(
+            Comment(text="Текст", post=target, author=another_user)
+            for _ in range(300)
+        )
+    mixer.blend("blog.Comment", post=other_post, author=user)
+    rebuild_comment_counts()
+
+    with django_assert_max_num_queries(30):
+        post.delete()
+    with django_assert_max_num_queries(30):
+        another_user.delete()
+    other_post.refresh_from_db()
+    assert other_post.comment_count == 1, (
+        "Убедитесь, что после удаления пользователя счётчики "
+        "комментариев пересчитаны."
+    )
@@ -0,0 +1,54 @@
+import re
+
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+COMMENT_ANCHOR = re.compile(r'name="comment_(\d+)"')
+
+
+@pytest.fixture
+def many_comments(mixer, post_with_published_location, settings):
+    settings.BLOG_COMMENTS_PER_PAGE = 3
+    return mixer.cycle(8).blend(
+        "blog.Comment", post=post_with_published_location
+    )
+
+
+def _comment_ids(response):
+    return [int(pk) for pk in COMMENT_ANCHOR.findall(response.content.decode())]
+
+
+def test_comments_are_loaded_in_portions(
+        client, post_with_published_location, many_comments):
+    post = post_with_published_location
+    expected = [comment.id for comment in many_comments]
+
+    response = client.get(f"/posts/{post.id}/")
+    seen = _comment_ids(response)
+    assert seen == expected[:3], (
+        "Убедитесь, что на странице поста выводится только первая порция "
+        "комментариев."
+    )
+    cursor = response.context["comments"].next_cursor
+    while cursor:
+        fragment = client.get(
+            f"/posts/{post.id}/comments/", {"comments_cursor": cursor}
+        )
+        assert "<html" not in fragment.content.decode()
+        seen += _comment_ids(fragment)
+        cursor = fragment.context["comments"].next_cursor
+    assert seen == expected
+
+
+def test_detail_queries_do_not_grow_with_comments(
+        client, mixer, post_with_published_location, many_comments,
+        django_assert_max_num_queries):
+    post = post_with_published_location
+    # Публикация с автором, категорией и местом — один запрос,
+    # порция комментариев — второй.
+    with django_assert_max_num_queries(2):
+        client.get(f"/posts/{post.id}/")
+    mixer.cycle(30).blend("blog.Comment", post=post)
+    with django_assert_max_num_queries(2):
+        client.get(f"/posts/{post.id}/")
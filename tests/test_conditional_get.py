@@ -0,0 +1,92 @@
+import pytest
+from django.core.cache import cache
+from django.utils.http import http_date
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _detail(client, post, **headers):
+    return client.get(f"/posts/{post.id}/", **headers)
+
+
+def test_repeat_visit_gets_304_without_render(
+        client, post_with_published_location, django_assert_max_num_queries):
+    post = post_with_published_location
+    response = _detail(client, post)
+    assert response.status_code == 200
+    etag, last_modified = response["ETag"], response["Last-Modified"]
+
+    # Валидаторы берутся из базы, а не из кэша процесса.
+    cache.clear()
+    with django_assert_max_num_queries(2):
+        # Пост с датой последнего комментария и порция комментариев.
+        repeat = _detail(client, post, HTTP_IF_NONE_MATCH=etag)
+    assert repeat.status_code == 304
+    assert _detail(
+        client, post, HTTP_IF_MODIFIED_SINCE=last_modified
+    ).status_code == 200, (
+        "Правку текста по Last-Modified не заметить: без If-None-Match "
+        "страница отдаётся целиком."
+    )
+
+
+def test_last_modified_follows_latest_comment(
+        client, mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.blend("blog.Comment", post=post)
+    latest = mixer.blend("blog.Comment", post=post)
+    assert _detail(client, post)["Last-Modified"] == http_date(
+        int(latest.created_at.timestamp())
+    )
+
+
+@pytest.mark.parametrize(
+    "change", ["comment", "comment_edit", "post", "category"]
+)
+def test_changes_invalidate_validators(
+        client, mixer, post_with_published_location, change):
+    post = post_with_published_location
+    comment = mixer.blend("blog.Comment", post=post)
+    etag = _detail(client, post)["ETag"]
+    if change == "comment":
+        mixer.blend("blog.Comment", post=post)
+    elif change == "comment_edit":
+        comment.text = "Исправленный комментарий"
+        comment.save()
+    elif change == "post":
+        post.text = "Исправленный текст"
+        post.save()
+    else:
+        post.category.title = "Новое название"
+        post.category.save()
+    response = _detail(client, post, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+def test_etag_depends_on_viewer(
+        client, user_client, post_with_published_location):
+    post = post_with_published_location
+    assert _detail(client, post)["ETag"] != _detail(user_client, post)["ETag"]
+
+
+def test_relogin_does_not_get_page_with_stale_csrf_token(
+        client, django_user_model, post_with_published_location):
+    post = post_with_published_location
+    django_user_model.objects.create_user("reader", password="Pa55-word")
+    credentials = {"username": "reader", "password": "Pa55-word"}
+    client.post("/auth/login/", credentials)
+    response = _detail(client, post)
+    etag, token = response["ETag"], client.cookies["csrftoken"].value
+
+    client.post("/auth/logout/")
+    client.post("/auth/login/", credentials)
+    assert client.cookies["csrftoken"].value != token
+    repeat = _detail(client, post, HTTP_IF_NONE_MATCH=etag)
+    assert repeat.status_code == 200, (
+        "Убедитесь, что после нового входа страница с формой "
+        "комментария отдаётся заново, с новым CSRF-токеном."
+    )
+    assert _detail(
+        client, post, HTTP_IF_NONE_MATCH=repeat["ETag"]
+    ).status_code == 304
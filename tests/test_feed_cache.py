@@ -0,0 +1,85 @@
+import pytest
+from django.core.cache import cache
+from django.test import override_settings
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def feed_cache():
+    cache.clear()
+    with override_settings(BLOG_FEED_CACHE_TIMEOUT=60):
+        yield
+    cache.clear()
+
+
+def _cache_status(client, url):
+    return client.get(url)["X-Feed-Cache"]
+
+
+def test_anonymous_feed_is_cached(client, post_with_published_location):
+    from blog.cache import feed_cache_stats
+
+    assert _cache_status(client, "/") == "MISS"
+    assert _cache_status(client, "/") == "HIT"
+    assert feed_cache_stats() == {"hits": 1, "misses": 1}
+
+
+def test_logged_in_feed_is_not_cached(
+        user_client, post_with_published_location):
+    assert not user_client.get("/").has_header("X-Feed-Cache")
+
+
+def test_post_save_invalidates_only_its_category(
+        client, mixer, user, post_with_published_location,
+        post_with_another_category):
+    own_url = f"/category/{post_with_published_location.category.slug}/"
+    other_url = f"/category/{post_with_another_category.category.slug}/"
+    for url in ("/", own_url, other_url):
+        client.get(url)
+
+    post_with_published_location.title = "Новый заголовок"
+    post_with_published_location.save()
+
+    assert _cache_status(client, "/") == "MISS"
+    assert _cache_status(client, own_url) == "MISS"
+    assert _cache_status(client, other_url) == "HIT"
+    assert "Новый заголовок" in client.get(own_url).content.decode()
+
+
+def test_comment_and_location_invalidate_feed(
+        client, mixer, post_with_published_location):
+    client.get("/")
+    mixer.blend("blog.Comment", post=post_with_published_location)
+    assert _cache_status(client, "/") == "MISS"
+
+    location = post_with_published_location.location
+    location.name = "Новое место"
+    location.save()
+    assert "Новое место" in client.get("/").content.decode()
+
+
+def test_process_local_cache_is_reported():
+    from blog.checks import check_feed_cache_backend
+
+    assert [
+        warning.id for warning in check_feed_cache_backend(None)
+    ] == ["blog.W001"], (
+        "Убедитесь, что включённый кэш ленты на LocMemCache "
+        "даёт предупреждение blog.W001."
+    )
+
+
+def test_production_profile_shares_feed_cache():
+    from blog.cache import PROCESS_LOCAL_BACKENDS
+    from blogicum import settings_production
+
+    assert settings_production.BLOG_FEED_CACHE_TIMEOUT
+    assert (
+        settings_production.CACHES["default"]["BACKEND"]
+        not in PROCESS_LOCAL_BACKENDS
+    ), "Кэш ленты в продакшене должен быть общим для всех воркеров."
+    with override_settings(CACHES=settings_production.CACHES):
+        from blog.checks import check_feed_cache_backend
+
+        assert not check_feed_cache_backend(None)
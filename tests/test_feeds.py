@@ -0,0 +1,87 @@
+import json
+from datetime import datetime, timedelta, timezone
+from xml.etree import ElementTree
+
+import pytest
+from django.core.cache import cache
+
+pytestmark = [pytest.mark.django_db]
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+PAST = datetime.now(timezone.utc) - timedelta(days=1)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def posts(mixer, user, published_category):
+    visible = [
+        mixer.blend(
+            "blog.Post", author=user, category=published_category,
+            is_published=True, title=f"Пост <{i}>",
+            pub_date=PAST - timedelta(hours=i),
+        )
+        for i in range(3)
+    ]
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=False, title="Скрытый", pub_date=PAST,
+    )
+    return visible
+
+
+def _body(response):
+    if response.streaming:
+        return b"".join(response.streaming_content)
+    return response.content
+
+
+def test_rss_lists_visible_posts(client, posts):
+    response = client.get("/feed/rss/")
+    assert response["Content-Type"].startswith("application/rss+xml")
+    channel = ElementTree.fromstring(_body(response)).find("channel")
+    titles = [item.findtext("title") for item in channel.iter("item")]
+    assert titles == [post.title for post in posts], (
+        "Убедитесь, что лента RSS строится по filter_posts()."
+    )
+
+
+def test_atom_and_json_feeds(client, posts, published_category, user):
+    root = ElementTree.fromstring(
+        _body(client.get(f"/category/{published_category.slug}/feed/atom/"))
+    )
+    assert len(root.findall(f"{ATOM}entry")) == 3
+    feed = json.loads(_body(client.get(f"/profile/{user.username}/feed/json/")))
+    assert [item["title"] for item in feed["items"]] == [
+        post.title for post in posts
+    ]
+    assert client.get("/feed/html/").status_code == 404
+
+
+def test_conditional_get_and_output_cache(
+        client, posts, mixer, user, published_category,
+        django_assert_max_num_queries):
+    first = client.get("/feed/atom/")
+    body = _body(first)
+    assert client.get(
+        "/feed/atom/", HTTP_IF_NONE_MATCH=first["ETag"]
+    ).status_code == 304
+
+    with django_assert_max_num_queries(1):
+        cached = client.get("/feed/atom/")
+    assert not cached.streaming and cached.content == body, (
+        "Убедитесь, что готовая лента берётся из кэша."
+    )
+
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=PAST + timedelta(hours=1),
+    )
+    fresh = client.get("/feed/atom/", HTTP_IF_NONE_MATCH=first["ETag"])
+    assert fresh.status_code == 200
+    assert fresh["ETag"] != first["ETag"]
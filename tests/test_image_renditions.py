@@ -0,0 +1,99 @@
+import pytest
+from django.core.management import call_command
+from PIL import Image
+
+from fixtures.images import make_image
+
+pytestmark = [pytest.mark.django_db, pytest.mark.usefixtures("media_root")]
+
+
+@pytest.fixture(autouse=True)
+def rendition_widths(settings):
+    settings.BLOG_IMAGE_RENDITION_WIDTHS = (200, 400, 1600)
+
+
+def _photo(width=800, height=500):
+    exif = Image.Exif()
+    exif[0x010F] = "Camera maker"
+    return make_image(
+        width, height, fmt="JPEG", name="photo.jpg", color=(200, 30, 30),
+        exif=exif,
+    )
+
+
+@pytest.fixture
+def post_with_photo(
+        mixer, user, published_category, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        post = mixer.blend(
+            "blog.Post", author=user, is_published=True,
+            category=published_category, image=_photo(),
+        )
+    post.refresh_from_db()
+    return post
+
+
+def test_renditions_are_built_after_save(post_with_photo, media_root):
+    from blog.images import rendition_name
+
+    post = post_with_photo
+    assert post.image_renditions == {
+        "name": post.image.name, "width": 800, "widths": [200, 400],
+    }
+    for width in (200, 400):
+        for fmt in ("webp", "jpeg"):
+            path = media_root / rendition_name(post.image.name, width, fmt)
+            with Image.open(path) as image:
+                assert image.width == width
+                assert not image.getexif()
+    assert not (
+        media_root / rendition_name(post.image.name, 1600, "webp")
+    ).exists()
+
+
+def test_templates_use_srcset(client, post_with_photo):
+    from blog.images import rendition_name
+
+    content = client.get(f"/posts/{post_with_photo.id}/").content.decode()
+    name = post_with_photo.image.name
+    assert f"{rendition_name(name, 400, 'webp')} 400w" in content
+    assert 'type="image/webp"' in content
+    assert f"{post_with_photo.image.url} 800w" in content
+
+
+def test_backfill_command(post_with_photo, PostModel):
+    PostModel.objects.update(image_renditions={})
+    call_command("build_image_renditions")
+    post_with_photo.refresh_from_db()
+    assert post_with_photo.image_renditions["widths"] == [200, 400]
+
+
+def test_renditions_of_legacy_image_name(
+        client, post_with_photo, PostModel, media_root):
+    from blog.images import rendition_name
+
+    # Фото, загруженное до адресации по содержимому.
+    legacy = "posts_images/legacy.jpg"
+    (media_root / legacy).write_bytes(_photo().read())
+    PostModel.objects.filter(pk=post_with_photo.pk).update(
+        image=legacy, image_renditions={}
+    )
+    call_command("build_image_renditions")
+
+    for fmt in ("webp", "jpeg"):
+        assert (media_root / rendition_name(legacy, 200, fmt)).is_file(), (
+            "Убедитесь, что копии старого фото лежат под именем, "
+            "по которому их ищет srcset."
+        )
+    renditions = {
+        path.name for path in (media_root / "posts_images").rglob("*_200w.*")
+    }
+    assert renditions == {"legacy_200w.webp", "legacy_200w.jpg"} | {
+        rendition_name(post_with_photo.image.name, 200, fmt).rsplit("/")[-1]
+        for fmt in ("webp", "jpeg")
+    }
+    content = client.get(f"/posts/{post_with_photo.id}/").content.decode()
+    assert f"{rendition_name(legacy, 200, 'webp')} 200w" in content
+
+    call_command("gc_post_images", "--grace=0")
+    assert (media_root / rendition_name(legacy, 200, "webp")).is_file()
@@ -0,0 +1,92 @@
+import hashlib
+
+import pytest
+from django.core.management import call_command
+
+from fixtures.images import make_image
+
+pytestmark = [pytest.mark.django_db, pytest.mark.usefixtures("media_root")]
+
+
+@pytest.fixture(autouse=True)
+def rendition_widths(settings):
+    settings.BLOG_IMAGE_RENDITION_WIDTHS = (20,)
+
+
+def _photo(color, name="photo.PNG"):
+    return make_image(name=name, color=color)
+
+
+@pytest.fixture
+def make_post(mixer, user, published_category,
+              django_capture_on_commit_callbacks):
+    def _make_post(image):
+        with django_capture_on_commit_callbacks(execute=True):
+            return mixer.blend(
+                "blog.Post", author=user, category=published_category,
+                image=image,
+            )
+    return _make_post
+
+
+def _refcount(name):
+    from blog.models import ImageBlob
+
+    return ImageBlob.objects.get(name=name).refcount
+
+
+def test_same_photo_is_stored_once(make_post, media_root):
+    photo = _photo("red")
+    digest = hashlib.sha256(photo.read()).hexdigest()
+    first = make_post(photo)
+    second = make_post(_photo("red", name="copy.png"))
+
+    assert first.image.name == second.image.name == (
+        f"posts_images/{digest[:2]}/{digest[2:4]}/{digest}.png"
+    )
+    assert _refcount(first.image.name) == 2
+    files = [path for path in media_root.rglob("*.png")]
+    assert len(files) == 1, "Убедитесь, что одинаковые фото не дублируются."
+
+
+def test_references_follow_edits_and_deletes(make_post):
+    post = make_post(_photo("red"))
+    old_name = post.image.name
+    post.image = _photo("blue")
+    post.save()
+    assert _refcount(old_name) == 0
+    assert _refcount(post.image.name) == 1
+    post.delete()
+    assert _refcount(post.image.name) == 0
+
+
+def test_gc_removes_unreferenced_files_with_renditions(
+        make_post, media_root):
+    from blog.images import rendition_name
+
+    kept = make_post(_photo("red"))
+    dropped = make_post(_photo("blue"))
+    dropped_name = dropped.image.name
+    assert (media_root / rendition_name(dropped_name, 20, "webp")).exists()
+    dropped.delete()
+    legacy = media_root / "posts_images" / "legacy.jpg"
+    legacy.write_bytes(b"orphan")
+
+    call_command("gc_post_images", "--grace=0", "--dry-run")
+    assert (media_root / dropped_name).exists()
+
+    call_command("gc_post_images", "--grace=0")
+    assert not (media_root / dropped_name).exists()
+    assert not (media_root / rendition_name(dropped_name, 20, "webp")).exists()
+    assert not legacy.exists()
+    assert (media_root / kept.image.name).exists()
+    assert (media_root / rendition_name(kept.image.name, 20, "jpeg")).exists()
+
+
+def test_recount_restores_references(make_post):
+    from blog.models import ImageBlob
+
+    post = make_post(_photo("red"))
+    ImageBlob.objects.all().delete()
+    call_command("gc_post_images", "--recount", "--grace=3600")
+    assert _refcount(post.image.name) == 1
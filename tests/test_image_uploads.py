@@ -0,0 +1,65 @@
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import SkipFile, StopFutureHandlers
+
+from fixtures.images import make_image
+
+pytestmark = [pytest.mark.django_db, pytest.mark.usefixtures("media_root")]
+
+
+@pytest.fixture
+def create(user_client, published_category, published_location):
+    def _create(image):
+        return user_client.post("/posts/create/", data={
+            "title": "С фото",
+            "text": "Текст",
+            "pub_date": "2020-01-01 12:00",
+            "is_published": True,
+            "category": published_category.id,
+            "location": published_location.id,
+            "image": image,
+        })
+    return _create
+
+
+def test_valid_image_is_moved_into_media(create, media_root, PostModel):
+    response = create(make_image())
+    assert response.status_code == 302
+    post = PostModel.objects.get(title="С фото")
+    assert (media_root / post.image.name).is_file()
+    assert not any((media_root / ".uploads").iterdir()), (
+        "Убедитесь, что временный файл переносится, а не копируется."
+    )
+
+
+@pytest.mark.parametrize("limits, image", [
+    ({"BLOG_IMAGE_MAX_BYTES": 100}, make_image(400, 400)),
+    ({"BLOG_IMAGE_MAX_PIXELS": 1000}, make_image(100, 100)),
+    ({}, SimpleUploadedFile("photo.png", b"not an image" * 100)),
+    ({}, make_image(fmt="BMP", name="photo.bmp")),
+])
+def test_rejected_image_shows_form_error(
+        create, settings, PostModel, limits, image):
+    for name, value in limits.items():
+        setattr(settings, name, value)
+    response = create(image)
+    assert response.status_code == 200
+    assert response.context["form"].errors.get("image"), (
+        "Убедитесь, что неподходящее фото не сохраняется, а форма "
+        "сообщает причину."
+    )
+    assert not PostModel.objects.filter(title="С фото").exists()
+
+
+def test_header_is_checked_before_whole_file(rf, settings):
+    from blog.uploads import ImageUploadHandler, upload_errors
+
+    settings.BLOG_IMAGE_MAX_PIXELS = 1000
+    data = make_image(2000, 2000).read()
+    request = rf.post("/")
+    handler = ImageUploadHandler(request)
+    with pytest.raises(StopFutureHandlers):
+        handler.new_file("image", "photo.png", "image/png", None)
+    with pytest.raises(SkipFile):
+        handler.receive_data_chunk(data[:1024], 0)
+    assert "image" in upload_errors(request)
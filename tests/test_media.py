@@ -0,0 +1,82 @@
+import pytest
+
+BLOB = "posts_images/ab/cd/abcd" + "0" * 60 + ".jpg"
+DATA = bytes(range(256)) * 4
+
+
+@pytest.fixture(autouse=True)
+def media_files(media_root):
+    for name in (BLOB, "notes.txt", ".uploads/partial.upload"):
+        path = media_root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(DATA)
+    return media_root
+
+
+def _body(response):
+    return b"".join(response.streaming_content)
+
+
+def test_full_file_has_cache_headers(client):
+    response = client.get(f"/media/{BLOB}")
+    assert response.status_code == 200
+    assert _body(response) == DATA
+    assert response["Accept-Ranges"] == "bytes"
+    assert "immutable" in response["Cache-Control"], (
+        "Убедитесь, что фото с именем-хэшем кэшируются навсегда."
+    )
+    assert "immutable" not in client.get("/media/notes.txt")["Cache-Control"]
+
+    repeat = client.get(f"/media/{BLOB}", HTTP_IF_NONE_MATCH=response["ETag"])
+    assert repeat.status_code == 304
+
+
+@pytest.mark.parametrize("header, status, body", [
+    ("bytes=2-5", 206, DATA[2:6]),
+    ("bytes=1000-", 206, DATA[1000:]),
+    ("bytes=-4", 206, DATA[-4:]),
+    ("bytes=5000-", 416, b""),
+    ("bytes=0-1,4-5", 200, DATA),
+])
+def test_range_requests(client, header, status, body):
+    response = client.get(f"/media/{BLOB}", HTTP_RANGE=header)
+    assert response.status_code == status
+    if status == 416:
+        assert response["Content-Range"] == f"bytes */{len(DATA)}"
+    else:
+        assert _body(response) == body
+        assert int(response["Content-Length"]) == len(body)
+
+
+def test_if_range_with_stale_etag_returns_whole_file(client):
+    response = client.get(
+        f"/media/{BLOB}", HTTP_RANGE="bytes=0-1", HTTP_IF_RANGE='"stale"'
+    )
+    assert response.status_code == 200
+    assert _body(response) == DATA
+
+
+def test_accel_redirect_hands_file_to_nginx(client, settings):
+    settings.MEDIA_SERVE_MODE = "x-accel-redirect"
+    response = client.get(f"/media/{BLOB}")
+    assert response["X-Accel-Redirect"] == f"/protected-media/{BLOB}"
+    assert response.content == b""
+    assert "ETag" in response
+
+    settings.MEDIA_SERVE_MODE = "x-sendfile"
+    response = client.get("/media/notes.txt")
+    assert response["X-Sendfile"].endswith("notes.txt")
+
+
+@pytest.mark.parametrize("path", [
+    ".uploads/partial.upload", "../outside.txt", "missing.jpg",
+    "posts_images",
+])
+def test_hidden_and_missing_files_are_not_served(rf, media_root, path):
+    from django.http import Http404
+
+    from blogicum.media import serve_media
+
+    (media_root.parent / "outside.txt").write_bytes(DATA)
+    with pytest.raises(Http404):
+        serve_media(rf.get("/"), path)
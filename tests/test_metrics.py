@@ -0,0 +1,151 @@
+import multiprocessing
+import re
+from types import SimpleNamespace
+
+import pytest
+from django.http import HttpResponse
+
+from pages import metrics
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def metrics_dir(settings, tmp_path):
+    settings.METRICS_ENABLED = True
+    settings.METRICS_DIR = tmp_path
+    settings.METRICS_ALLOWED_IPS = ["127.0.0.1"]
+    yield tmp_path
+    metrics.clear_metrics()
+
+
+def _samples(text):
+    samples = {}
+    for line in text.splitlines():
+        if line.startswith("#"):
+            continue
+        series, value = line.rsplit(" ", 1)
+        samples[series] = float(value)
+    return samples
+
+
+def _scrape(client):
+    response = client.get("/pages/metrics/")
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+    return _samples(response.content.decode())
+
+
+def _observe_in_child(view):
+    timing = SimpleNamespace(total=0.02, sql_count=3, sql_time=0.001)
+    metrics.observe(view, timing, HttpResponse(status=500))
+
+
+def test_metrics_per_url_name(client):
+    for _ in range(2):
+        client.get("/")
+    client.get("/pages/about/")
+    samples = _scrape(client)
+    assert samples[
+        'blogicum_http_requests_total{status="200",view="blog:index"}'
+    ] == 2, "Убедитесь, что запросы считаются по имени URL и коду ответа."
+    assert samples[
+        'blogicum_http_request_duration_seconds_bucket'
+        '{view="blog:index",le="+Inf"}'
+    ] == 2, "Убедитесь, что гистограмма времени ответа накопительная."
+    assert samples[
+        'blogicum_http_request_duration_seconds_count{view="blog:index"}'
+    ] == 2
+    assert samples[
+        'blogicum_db_queries_per_request_sum{view="blog:index"}'
+    ] > 0, "Убедитесь, что метрики учитывают число SQL-запросов."
+    assert 'blogicum_http_requests_total{status="200",view="pages:about"}' in (
+        samples
+    )
+
+
+def test_histogram_buckets_are_cumulative(client):
+    client.get("/")
+    text = client.get("/pages/metrics/").content.decode()
+    counts = [
+        float(value) for value in re.findall(
+            r'^blogicum_db_queries_per_request_bucket'
+            r'\{view="blog:index",le="[^"]+"\} (\S+)$',
+            text, re.MULTILINE,
+        )
+    ]
+    assert len(counts) == len(metrics.QUERY_BUCKETS) + 1
+    assert counts == sorted(counts) and counts[-1] == 1
+
+
+def test_metrics_merge_across_workers(client):
+    client.get("/")
+    worker = multiprocessing.get_context("fork").Process(
+        target=_observe_in_child, args=("blog:index",)
+    )
+    worker.start()
+    worker.join()
+    assert worker.exitcode == 0
+    samples = _scrape(client)
+    assert samples[
+        'blogicum_http_requests_total{status="500",view="blog:index"}'
+    ] == 1, "Убедитесь, что метрики других воркеров попадают в экспорт."
+    assert samples[
+        'blogicum_http_request_duration_seconds_count{view="blog:index"}'
+    ] == 2
+
+
+def test_scrape_does_not_query_database(client, django_assert_num_queries):
+    client.get("/")
+    with django_assert_num_queries(0):
+        client.get("/pages/metrics/")
+
+
+def test_metrics_file_survives_reopen(metrics_dir):
+    path = metrics_dir / "worker.metrics"
+    first = metrics.MetricsFile(path)
+    for number in range(5000):
+        first.add(f"key-{number}".encode(), number)
+    first.close()
+    second = metrics.MetricsFile(path)
+    second.add(b"key-42", 1)
+    second.close()
+    values = metrics.read_file(path)
+    assert len(values) == 5000
+    assert values[b"key-42"] == 43, (
+        "Убедитесь, что файл метрик растёт и продолжается после повторного "
+        "открытия."
+    )
+
+
+def test_metrics_access(client, user_client, user, settings):
+    settings.METRICS_ALLOWED_IPS = []
+    settings.METRICS_TOKEN = "secret"
+    assert client.get("/pages/metrics/").status_code == 403, (
+        "Убедитесь, что метрики закрыты для посторонних адресов."
+    )
+    assert client.get(
+        "/pages/metrics/", HTTP_AUTHORIZATION="Bearer wrong"
+    ).status_code == 403
+    assert client.get(
+        "/pages/metrics/", HTTP_AUTHORIZATION="Bearer secret"
+    ).status_code == 200, "Убедитесь, что сборщик проходит по токену."
+    user.is_staff = True
+    user.save()
+    assert user_client.get("/pages/metrics/").status_code == 200
+
+
+def test_metrics_are_closed_and_off_by_default(client, settings):
+    from blogicum import settings as defaults
+
+    settings.METRICS_ALLOWED_IPS = defaults.METRICS_ALLOWED_IPS
+    settings.METRICS_TOKEN = defaults.METRICS_TOKEN
+    settings.METRICS_DIR = defaults.METRICS_DIR
+    assert client.get("/pages/metrics/").status_code == 403, (
+        "Убедитесь, что по умолчанию метрики не открыты даже для "
+        "127.0.0.1: за nginx это адрес любого посетителя."
+    )
+    assert not metrics.metrics_enabled(), (
+        "Убедитесь, что без METRICS_DIR метрики не пишутся в общий "
+        "для машины каталог."
+    )
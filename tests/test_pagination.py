@@ -0,0 +1,157 @@
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from django.utils import timezone
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_posts(mixer, user, published_category, published_location):
+    now = timezone.now()
+    pub_dates = (now - timedelta(hours=i + 1) for i in range(N_PER_PAGE * 2 + 5))
+    return mixer.cycle(N_PER_PAGE * 2 + 5).blend(
+        "blog.Post",
+        author=user,
+        is_published=True,
+        category=published_category,
+        location=published_location,
+        pub_date=pub_dates,
+    )
+
+
+def _ids(response):
+    return [post.id for post in response.context["page_obj"]]
+
+
+@pytest.mark.parametrize("url", ["/", "/category/{slug}/"])
+def test_cursor_pagination_walks_feed(client, feed_posts, url):
+    url = url.format(slug=feed_posts[0].category.slug)
+    expected = [post.id for post in feed_posts]
+
+    seen = []
+    response = client.get(url, {"cursor": ""})
+    while True:
+        page = response.context["page_obj"]
+        seen.extend(_ids(response))
+        if not page.has_next():
+            break
+        response = client.get(url, {"cursor": page.next_cursor})
+    assert seen == expected, (
+        "Убедитесь, что курсорная пагинация обходит ленту по убыванию "
+        "даты публикации без пропусков и повторов."
+    )
+
+    newer = client.get(
+        url, {"cursor": response.context["page_obj"].previous_cursor}
+    )
+    assert _ids(newer) == expected[N_PER_PAGE:N_PER_PAGE * 2]
+
+
+def test_cursor_pagination_skips_count(
+        client, feed_posts, django_assert_max_num_queries):
+    first = client.get("/", {"cursor": ""}).context["page_obj"]
+    # Одна выборка страницы, без отдельного SELECT COUNT(*).
+    with django_assert_max_num_queries(1):
+        client.get("/", {"cursor": first.next_cursor})
+
+
+def test_invalid_cursor_is_404(client):
+    assert client.get("/", {"cursor": "garbage!"}).status_code == 404
+
+
+def test_paginator_renders_elided_range():
+    from django.core.paginator import Paginator
+    from django.template.loader import render_to_string
+
+    page = Paginator(range(500_000), N_PER_PAGE).page(2500)
+    html = render_to_string("includes/paginator.html", {"page_obj": page})
+    assert html.count("page-item") < 20, (
+        "Убедитесь, что пагинатор не выводит ссылку на каждую страницу."
+    )
+    for number in (1, 2498, 2500, 2502, 50_000):
+        assert f"?page={number}\"" in html or f">{number}<" in html
+    assert "…" in html
+
+
+@pytest.fixture
+def small_threshold(settings):
+    from django.core.cache import cache
+
+    settings.BLOG_COUNT_CACHE_TIMEOUT = 60
+    settings.BLOG_COUNT_EXACT_THRESHOLD = 5
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def test_small_feeds_are_counted_exactly(
+        client, mixer, user, published_category, small_threshold):
+    mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(days=1),
+    )
+    assert client.get("/").context["paginator"].count == 3
+
+
+def test_large_feed_count_is_cached_and_refreshed(
+        client, feed_posts, small_threshold, monkeypatch,
+        django_assert_max_num_queries):
+    from blog import cache as blog_cache
+
+    assert client.get("/").context["paginator"].count == len(feed_posts)
+    with django_assert_max_num_queries(1):
+        # Только выборка страницы: число публикаций берётся из кэша.
+        client.get("/", {"page": 2})
+
+    started = []
+
+    class RecordingThread:
+        def __init__(self, target, args, daemon):
+            self.args = args
+
+        def start(self):
+            started.append(self.args)
+
+    monkeypatch.setattr(blog_cache.threading, "Thread", RecordingThread)
+    feed_posts[0].delete()
+    stale = client.get("/").context["paginator"].count
+    assert stale == len(feed_posts), (
+        "Пока идёт фоновый пересчёт, отдаётся последнее известное число."
+    )
+    assert len(started) == 1
+
+    blog_cache._refresh_count(*started[0])
+    assert client.get("/").context["paginator"].count == len(feed_posts) - 1
+
+
+def test_count_is_reset_only_by_membership_changes(
+        client, mixer, user, feed_posts, small_threshold, monkeypatch):
+    from blog import cache as blog_cache
+
+    client.get("/")
+    started = []
+    monkeypatch.setattr(
+        blog_cache.threading, "Thread",
+        lambda target, args, daemon: SimpleNamespace(
+            start=lambda: started.append(args)
+        ),
+    )
+    mixer.blend("blog.Comment", post=feed_posts[0], author=user)
+    feed_posts[1].title = "Новый заголовок"
+    feed_posts[1].save()
+    client.get("/")
+    assert not started, (
+        "Убедитесь, что комментарии и правка текста не сбрасывают "
+        "кэш числа публикаций."
+    )
+
+    feed_posts[1].is_published = False
+    feed_posts[1].save()
+    client.get("/")
+    assert len(started) == 1, (
+        "Убедитесь, что снятие публикации сбрасывает число публикаций."
+    )
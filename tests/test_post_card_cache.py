@@ -0,0 +1,50 @@
+import pytest
+from django.core.cache import cache
+
+from blog.cache import LRUCache, card_lru, render_post_card
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def clean_card_cache():
+    cache.clear()
+    card_lru.clear()
+    yield
+    cache.clear()
+    card_lru.clear()
+
+
+def test_card_is_served_from_cache(
+        post_with_published_location, django_assert_num_queries):
+    post = post_with_published_location
+    first = render_post_card(post)
+    hits = card_lru.hits
+    with django_assert_num_queries(0):
+        assert render_post_card(post) == first
+    assert card_lru.hits == hits + 1
+
+
+def test_card_rerenders_on_related_changes(
+        post_with_published_location, mixer):
+    post = post_with_published_location
+    render_post_card(post)
+
+    post.comment_count = 7
+    assert "Комментарии (7)" in render_post_card(post)
+
+    post.category.title = "Другая категория"
+    assert "Другая категория" in render_post_card(post)
+
+    post.location.is_published = False
+    assert "Планета Земля" in render_post_card(post)
+
+
+def test_lru_evicts_least_recently_used():
+    lru = LRUCache(2)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    lru.get("a")
+    lru.set("c", 3)
+    assert lru.get("b") is None
+    assert (lru.get("a"), lru.get("c")) == (1, 3)
@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta, timezone
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import override_settings
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def shared_cache(tmp_path):
+    # Общий для процессов кэш, как в продакшене: LocMemCache команда
+    # не принимает.
+    with override_settings(CACHES={"default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": str(tmp_path / "cache"),
+    }}):
+        yield
+        cache.clear()
+
+
+def test_publish_scheduled_requires_shared_cache():
+    with pytest.raises(CommandError):
+        call_command("publish_scheduled", "--once")
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(BLOG_FEED_CACHE_TIMEOUT=60, BLOG_VISIBILITY_BUCKET=3600)
+def test_publish_scheduled_invalidates_and_warms(
+        shared_cache, live_server, client, mixer, user, published_category):
+    post = mixer.blend(
+        "blog.Post", author=user, is_published=True,
+        category=published_category,
+        pub_date=datetime.now(timezone.utc) - timedelta(hours=2),
+    )
+    # Публикация «наступила» без сохранения модели: сигналов не было.
+    cache.clear()
+
+    out = StringIO()
+    call_command(
+        "publish_scheduled", "--once", "--rescan", str(3 * 60 * 60),
+        "--base-url", live_server.url, stdout=out,
+    )
+
+    assert f"#{post.pk}" in out.getvalue()
+    assert "прогрев /: 200" in out.getvalue(), (
+        "Убедитесь, что ленту прогревает HTTP-запрос к запущенному сайту."
+    )
+    response = client.get("/")
+    assert response["X-Feed-Cache"] == "HIT", (
+        "Убедитесь, что после публикации лента прогревается заново."
+    )
+    assert post.title in response.content.decode()
+
+
+@override_settings(BLOG_VISIBILITY_BUCKET=60)
+def test_schedule_skips_rescheduled_posts(mixer, user, published_category):
+    from blog.management.commands.publish_scheduled import Command
+
+    now = datetime.now(timezone.utc)
+    post = mixer.blend(
+        "blog.Post", author=user, is_published=True,
+        category=published_category, pub_date=now + timedelta(minutes=5),
+    )
+    command = Command()
+    command.heap, command.scheduled, command.fired = [], {}, {}
+    command.schedule(now, now + timedelta(hours=1))
+    post.pub_date = now + timedelta(minutes=30)
+    post.save()
+    command.schedule(now, now + timedelta(hours=1))
+
+    assert len(command.heap) == 2
+    published = []
+    command.publish = published.extend
+    command.publish_due(now + timedelta(minutes=10))
+    assert published == []
+    command.publish_due(now + timedelta(minutes=40))
+    assert published == [post.pk]
+
+
+@override_settings(BLOG_VISIBILITY_BUCKET=60)
+def test_rescan_does_not_fire_post_twice(mixer, user, published_category):
+    from blog.management.commands.publish_scheduled import Command
+
+    now = datetime.now(timezone.utc)
+    post = mixer.blend(
+        "blog.Post", author=user, is_published=True,
+        category=published_category, pub_date=now + timedelta(minutes=5),
+    )
+    command = Command()
+    command.heap, command.scheduled, command.fired = [], {}, {}
+    published = []
+    command.publish = published.extend
+
+    # Тот же порядок, что в цикле handle(): скан, публикация, пересканы.
+    command.schedule(now, now + timedelta(hours=1))
+    command.publish_due(now + timedelta(minutes=10))
+    rescan_at = now + timedelta(minutes=10)
+    command.schedule(now, rescan_at + timedelta(hours=1))
+    command.publish_due(rescan_at)
+    command.schedule(rescan_at, rescan_at + timedelta(hours=1))
+    command.publish_due(rescan_at + timedelta(minutes=1))
+
+    assert published == [post.pk], (
+        "Убедитесь, что пересканирование не публикует пост повторно."
+    )
+    assert not command.fired, (
+        "Сработавшие посты забываются, когда выходят из окна скана."
+    )
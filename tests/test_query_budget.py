@@ -0,0 +1,71 @@
+import pytest
+from django.test import Client
+from django.urls import reverse
+
+from blog.urls import urlpatterns
+
+pytestmark = [pytest.mark.django_db]
+
+# Имя URL -> (клиент, метод, бюджет SQL-запросов, бюджет байт ответа).
+# Число запросов не должно зависеть от числа публикаций: один бюджет
+# на все масштабы из --query-budget-scales.
+BUDGETS = {
+    "index": ("anonymous", "get", 4, 20_000),
+    "category_posts": ("anonymous", "get", 5, 20_000),
+    "post_detail": ("anonymous", "get", 3, 25_000),
+    "comments": ("anonymous", "get", 3, 20_000),
+    "profile": ("anonymous", "get", 5, 20_000),
+    "search": ("anonymous", "get", 3, 20_000),
+    "index_feed": ("anonymous", "get", 3, 25_000),
+    "category_feed": ("anonymous", "get", 4, 25_000),
+    "author_feed": ("anonymous", "get", 4, 25_000),
+    "create_post": ("author", "get", 5, 8_000),
+    "edit_profile": ("author", "get", 3, 6_000),
+    "edit_post": ("author", "get", 8, 8_000),
+    "delete_post": ("author", "get", 6, 6_000),
+    "add_comment": ("author", "post", 7, 1_000),
+    "edit_comment": ("reader", "get", 5, 5_000),
+    "delete_comment": ("reader", "get", 4, 5_000),
+}
+
+
+def _url(name, blog):
+    post, comment = blog.post, blog.comment
+    kwargs = {
+        "category_posts": {"category_slug": blog.category.slug},
+        "category_feed": {"category_slug": blog.category.slug, "fmt": "rss"},
+        "post_detail": {"pk": post.pk},
+        "comments": {"pk": post.pk},
+        "edit_post": {"pk": post.pk},
+        "delete_post": {"pk": post.pk},
+        "add_comment": {"pk": post.pk},
+        "profile": {"username": blog.author.username},
+        "author_feed": {"username": blog.author.username, "fmt": "atom"},
+        "index_feed": {"fmt": "json"},
+        "edit_comment": {"post_id": post.pk, "id": comment.pk},
+        "delete_comment": {"post_id": post.pk, "comment_id": comment.pk},
+    }.get(name, {})
+    url = reverse(f"blog:{name}", kwargs=kwargs)
+    return url + "?q=пост" if name == "search" else url
+
+
+def test_every_blog_url_has_budget():
+    names = {pattern.name for pattern in urlpatterns}
+    assert names == set(BUDGETS), (
+        "Убедитесь, что для каждого адреса из `blog/urls.py` задан бюджет "
+        "SQL-запросов и размера ответа."
+    )
+
+
+def test_blog_pages_fit_budget(blog_at_scale, query_budget):
+    blog = blog_at_scale
+    clients = {"anonymous": Client()}
+    for role in ("author", "reader"):
+        clients[role] = Client()
+        clients[role].force_login(getattr(blog, role))
+    for name, (role, method, max_queries, max_bytes) in BUDGETS.items():
+        data = {"text": "Новый комментарий"} if method == "post" else None
+        query_budget(
+            clients[role], _url(name, blog), max_queries, max_bytes,
+            method=method, data=data,
+        )
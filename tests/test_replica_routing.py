@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from django.core.management import call_command
+from django.db import connections
+
+pytestmark = [pytest.mark.django_db]
+
+PUB_DATE = datetime.now(timezone.utc) - timedelta(days=1)
+
+
+@pytest.fixture
+def replica(settings, tmp_path):
+    """Вторая база SQLite в отдельном файле вместо настоящей реплики."""
+    alias = "replica"
+    connections.settings[alias] = connections.configure_settings({
+        "default": dict(connections.settings["default"]),
+        alias: {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": str(tmp_path / "replica.sqlite3"),
+        },
+    })[alias]
+    call_command("migrate", database=alias, verbosity=0)
+    settings.BLOG_READ_REPLICAS = [alias]
+    yield alias
+    connections[alias].close()
+    del connections[alias]
+    del connections.settings[alias]
+
+
+def _post(using, title, username="author"):
+    from django.contrib.auth import get_user_model
+
+    from blog.models import Category, Post
+
+    author, _ = get_user_model().objects.using(using).get_or_create(
+        username=username
+    )
+    category, _ = Category.objects.using(using).get_or_create(
+        slug="replica", defaults={"title": "Категория", "description": "-"}
+    )
+    return Post.objects.using(using).create(
+        title=title, text="Текст", pub_date=PUB_DATE,
+        author=author, category=category,
+    )
+
+
+def test_feed_views_read_from_replica(client, replica):
+    _post(replica, "С реплики")
+    _post("default", "С основной")
+    for url in ("/", "/category/replica/", "/profile/author/"):
+        content = client.get(url).content.decode()
+        assert "С реплики" in content, (
+            f"Убедитесь, что {url} читает публикации с реплики."
+        )
+        assert "С основной" not in content
+
+
+def test_author_reads_own_writes_from_primary(user_client, user, replica):
+    from blog.models import Comment
+
+    post = _post("default", "С основной")
+    _post(replica, "С реплики")
+
+    response = user_client.post(
+        f"/posts/{post.pk}/comment/", data={"text": "Мой комментарий"}
+    )
+    assert response.cookies["blog_primary"]["max-age"] == 10
+    assert Comment.objects.using("default").filter(post=post).exists()
+    assert not Comment.objects.using(replica).exists()
+
+    content = user_client.get(f"/posts/{post.pk}/").content.decode()
+    assert "Мой комментарий" in content, (
+        "Убедитесь, что после записи автор читает из основной базы."
+    )
+    assert "С основной" in user_client.get("/").content.decode()
+
+
+def test_without_replicas_everything_uses_default(client, settings):
+    from blog.routing import PIN_COOKIE
+
+    settings.BLOG_READ_REPLICAS = []
+    _post("default", "С основной")
+    response = client.get("/")
+    assert "С основной" in response.content.decode()
+    assert PIN_COOKIE not in response.cookies
@@ -0,0 +1,93 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from pages.instrumentation import reset_timings, timing_summary
+
+pytestmark = [pytest.mark.django_db]
+
+PAST = datetime.now(timezone.utc) - timedelta(days=1)
+
+
+@pytest.fixture(autouse=True)
+def clean_timings():
+    reset_timings()
+    yield
+    reset_timings()
+
+
+def _server_timing(response):
+    metrics = {}
+    for part in response["Server-Timing"].split(","):
+        name, *params = part.strip().split(";")
+        metrics[name] = dict(param.split("=", 1) for param in params)
+    return metrics
+
+
+def test_server_timing_header(client, mixer, user, published_category):
+    mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=PAST,
+    )
+    response = client.get("/")
+    assert response.status_code == 200
+    metrics = _server_timing(response)
+    assert {"sql", "tpl", "total"} <= set(metrics), (
+        "Убедитесь, что ответ содержит заголовок Server-Timing с метриками "
+        "sql, tpl и total."
+    )
+    sql_count = int(metrics["sql"]["desc"].strip('"').split()[0])
+    assert sql_count > 0, (
+        "Убедитесь, что Server-Timing сообщает число SQL-запросов."
+    )
+    assert 0 < float(metrics["tpl"]["dur"]) <= float(
+        metrics["total"]["dur"]
+    ), "Убедитесь, что время рендера шаблонов учитывается в Server-Timing."
+
+
+def test_timings_grouped_by_url_name(client):
+    for _ in range(3):
+        client.get("/")
+    client.get("/pages/about/")
+    client.get("/no-such-page/")
+    summary = timing_summary()
+    assert summary["blog:index"]["requests"] == 3, (
+        "Убедитесь, что замеры складываются в буфер по имени URL."
+    )
+    assert summary["pages:about"]["requests"] == 1
+    assert "<unresolved>" in summary, (
+        "Убедитесь, что запросы без маршрута учитываются отдельно."
+    )
+    assert summary["blog:index"]["sql_count_max"] > 0
+
+
+def test_timing_buffer_is_bounded(client, settings):
+    settings.REQUEST_TIMING_BUFFER = 2
+    reset_timings()
+    for _ in range(5):
+        client.get("/pages/rules/")
+    assert timing_summary()["pages:rules"]["requests"] == 2, (
+        "Убедитесь, что буфер замеров ограничен REQUEST_TIMING_BUFFER."
+    )
+
+
+def test_timing_disabled(client, settings):
+    settings.REQUEST_TIMING = False
+    response = client.get("/")
+    assert "Server-Timing" not in response
+    assert timing_summary() == {}
+
+
+def test_timings_view_staff_only(client, user_client, user):
+    client.get("/")
+    assert user_client.get("/pages/timings/").status_code == 302, (
+        "Убедитесь, что сводка замеров недоступна обычным пользователям."
+    )
+    user.is_staff = True
+    user.save()
+    response = user_client.get("/pages/timings/")
+    assert response.status_code == 200
+    assert "blog:index" in json.loads(response.content), (
+        "Убедитесь, что pages:timings отдаёт сводку замеров в JSON."
+    )
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+PAST = datetime.now(timezone.utc) - timedelta(days=1)
+
+
+@pytest.fixture
+def make_post(mixer, user, published_category):
+    def _make_post(title, text="Текст", **fields):
+        fields.setdefault("category", published_category)
+        fields.setdefault("is_published", True)
+        fields.setdefault("pub_date", PAST)
+        return mixer.blend(
+            "blog.Post", author=user, title=title, text=text, **fields
+        )
+    return _make_post
+
+
+def _found(client, query, page=1):
+    response = client.get("/search/", {"q": query, "page": page})
+    assert response.status_code == 200
+    return list(response.context["page_obj"])
+
+
+def test_search_ranks_and_respects_visibility(
+        client, make_post, mixer):
+    in_text = make_post("Заметка", "Сегодня кошки спали весь день")
+    in_title = make_post("Кошки и коты", "Про животных")
+    make_post("Кошки скрыты", is_published=False)
+    make_post("Кошки в будущем", pub_date=PAST + timedelta(days=30))
+    make_post(
+        "Кошки в черновике",
+        category=mixer.blend("blog.Category", is_published=False),
+    )
+    assert _found(client, "кошк") == [in_title, in_text], (
+        "Убедитесь, что поиск ищет по заголовку и тексту, ставит "
+        "совпадения в заголовке выше и скрывает неопубликованное."
+    )
+    assert _found(client, "кошки день") == [in_text]
+    assert _found(client, '"; DROP TABLE blog_post; --') == []
+    assert _found(client, "") == []
+
+
+def test_index_follows_save_and_delete(client, make_post):
+    post = make_post("Старый заголовок")
+    post.title = "Новый заголовок"
+    post.save()
+    assert _found(client, "старый") == []
+    assert _found(client, "новый") == [post]
+    post.delete()
+    assert _found(client, "новый") == []
+
+
+def test_rebuild_after_bulk_changes(client, make_post, PostModel):
+    post = make_post("Заголовок")
+    PostModel.objects.filter(pk=post.pk).update(title="Переименован")
+    assert _found(client, "переименован") == []
+    call_command("rebuild_search_index")
+    assert _found(client, "переименован") == [post]
+
+
+def test_pagination_keeps_query(client, make_post):
+    for i in range(12):
+        make_post(f"Поиск {i}")
+    content = client.get("/search/", {"q": "поиск"}).content.decode()
+    assert "?q=%D0%BF%D0%BE%D0%B8%D1%81%D0%BA&amp;page=2" in content
+    assert len(_found(client, "поиск", page=2)) == 2
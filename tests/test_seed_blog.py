@@ -0,0 +1,64 @@
+from collections import Counter
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+from blog.comment_counts import find_comment_count_mismatches
+from blog.models import Category, Comment, Post
+from blog.search import search_posts
+
+pytestmark = [pytest.mark.django_db]
+
+SIZES = dict(users=30, categories=10, locations=5, posts=600, comments=900)
+
+
+def _seed(prefix, seed=0):
+    call_command(
+        "seed_blog", prefix=prefix, seed=seed, batch_size=128, **SIZES
+    )
+    posts = Post.objects.filter(author__username__startswith=f"{prefix}-")
+    return posts.order_by("pk")
+
+
+def test_seed_blog_creates_skewed_blog():
+    posts = _seed("load")
+    assert posts.count() == SIZES["posts"]
+    assert Comment.objects.count() == SIZES["comments"]
+    assert get_user_model().objects.count() == SIZES["users"]
+
+    per_author = Counter(posts.values_list("author", flat=True))
+    assert per_author.most_common(1)[0][1] > 3 * (
+        SIZES["posts"] / SIZES["users"]
+    ), "Убедитесь, что у популярных авторов больше публикаций."
+    top_post = posts.order_by("-comment_count").first()
+    assert top_post.comment_count > 3 * (
+        SIZES["comments"] / SIZES["posts"]
+    ), "Убедитесь, что комментарии сосредоточены на «горячих» постах."
+    assert posts.filter(pub_date__gt=timezone.now()).exists(), (
+        "Убедитесь, что среди публикаций есть отложенные."
+    )
+    assert Category.objects.filter(is_published=False).exists()
+    assert not find_comment_count_mismatches(), (
+        "Убедитесь, что после генерации пересчитаны Post.comment_count."
+    )
+    assert search_posts(Post.objects.all(), top_post.title).exists(), (
+        "Убедитесь, что после генерации пересобран поисковый индекс."
+    )
+
+
+def test_seed_blog_is_reproducible():
+    fields = ("title", "text", "is_published", "comment_count")
+    first = list(_seed("first", seed=7).values_list(*fields))
+    second = list(_seed("second", seed=7).values_list(*fields))
+    assert first == second, (
+        "Убедитесь, что одинаковый --seed даёт одинаковые данные."
+    )
+    assert first != list(_seed("third", seed=8).values_list(*fields))
+
+
+def test_seed_blog_refuses_existing_prefix():
+    call_command("seed_blog", users=1, posts=0, comments=0, categories=1)
+    with pytest.raises(CommandError):
+        call_command("seed_blog", users=1, posts=0, comments=0)
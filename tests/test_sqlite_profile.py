@@ -0,0 +1,52 @@
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db.utils import ConnectionHandler
+
+
+@pytest.fixture(autouse=True)
+def separate_database(django_db_blocker):
+    # Отдельный файл, не тестовая база: блокировка pytest-django ни к чему.
+    with django_db_blocker.unblock():
+        yield
+
+
+def _connection(tmp_path, **options):
+    handler = ConnectionHandler({"default": {
+        "ENGINE": "blogicum.sqlite",
+        "NAME": str(tmp_path / "tuned.sqlite3"),
+        "OPTIONS": options,
+    }})
+    return handler["default"]
+
+
+def _pragma(connection, name):
+    with connection.cursor() as cursor:
+        cursor.execute(f"PRAGMA {name}")
+        return cursor.fetchone()[0]
+
+
+def test_pragmas_are_applied_on_connect(tmp_path):
+    connection = _connection(tmp_path, pragmas={"cache_size": -1000})
+    try:
+        assert _pragma(connection, "journal_mode") == "wal"
+        assert _pragma(connection, "synchronous") == 1, "NORMAL"
+        assert _pragma(connection, "busy_timeout") == 5000
+        assert _pragma(connection, "cache_size") == -1000
+    finally:
+        connection.close()
+
+
+def test_invalid_pragma_is_rejected(tmp_path):
+    connection = _connection(
+        tmp_path, pragmas={"cache_size": "1; DROP TABLE x"}
+    )
+    with pytest.raises(ImproperlyConfigured):
+        connection.ensure_connection()
+
+
+def test_production_profile_reuses_connections():
+    from blogicum import settings_production
+
+    database = settings_production.DATABASES["default"]
+    assert database["ENGINE"] == "blogicum.sqlite"
+    assert database["CONN_MAX_AGE"] > 0
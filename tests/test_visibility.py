@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from django.test import override_settings
+
+from blog import visibility
+
+
+@override_settings(BLOG_VISIBILITY_BUCKET=60)
+def test_horizon_is_shared_within_bucket():
+    start = datetime(2024, 5, 1, 12, 0, 0, tzinfo=timezone.utc)
+    horizons = {
+        visibility.visibility_horizon(start + timedelta(seconds=s))
+        for s in range(0, 60, 7)
+    }
+    assert horizons == {start}
+    assert visibility.visibility_horizon(
+        start + timedelta(seconds=61)) == start + timedelta(minutes=1)
+
+
+@override_settings(BLOG_VISIBILITY_BUCKET=60)
+def test_visible_at_is_bounded_by_bucket():
+    pub_date = datetime(2024, 5, 1, 12, 0, 30, tzinfo=timezone.utc)
+    moment = visibility.visible_at(pub_date)
+    assert pub_date < moment <= pub_date + timedelta(seconds=60)
+    assert visibility.visibility_horizon(moment) > pub_date
+    assert visibility.visibility_horizon(
+        moment - timedelta(microseconds=1)) <= pub_date
+
+
+@pytest.mark.django_db
+@override_settings(BLOG_VISIBILITY_BUCKET=60)
+def test_scheduled_post_appears_without_restart(
+        client, mixer, user, published_category, monkeypatch):
+    now = datetime.now(timezone.utc)
+    post = mixer.blend(
+        "blog.Post", author=user, is_published=True,
+        category=published_category, pub_date=now + timedelta(seconds=30),
+    )
+    assert post not in client.get("/").context["page_obj"]
+
+    monkeypatch.setattr(
+        visibility.timezone, "now", lambda: now + timedelta(seconds=91)
+    )
+    assert post in client.get("/").context["page_obj"], (
+        "Убедитесь, что отложенная публикация появляется в ленте "
+        "без перезапуска сервера."
+    )
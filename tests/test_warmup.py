@@ -0,0 +1,17 @@
+from django.template import engines
+from django.test import override_settings
+
+from blogicum import settings_production
+from blogicum.warmup import warm_templates
+
+
+@override_settings(TEMPLATES=settings_production.TEMPLATES)
+def test_warmup_fills_cached_loader():
+    report = warm_templates()
+    assert report.failed == []
+
+    loader = engines["django"].engine.template_loaders[0]
+    cached_names = {name for name in loader.get_template_cache}
+    for name in ("base.html", "includes/post_card.html", "blog/detail.html"):
+        assert name in cached_names
+    assert report.compiled == len(cached_names)